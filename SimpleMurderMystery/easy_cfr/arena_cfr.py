@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_tree_arena import GameTreeArena, compile_game_tree
+from easy_cfr.packed_policy import PackedTabularPolicy
+from easy_cfr.segmented_policy import SegmentedTabularPolicy
+from easy_cfr.policy_player import MyPolicy
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy
+
+arena_logger = logging.getLogger(__name__)
+
+c_handler = logging.StreamHandler()
+c_handler.setLevel(logging.DEBUG)
+
+arena_logger.addHandler(c_handler)
+
+
+def decision_edge_index(arena: GameTreeArena, rows: npt.NDArray, width: int) -> npt.NDArray:
+    """
+    For each node whose parent is a decision node, returns the index of the (information set, action) entry
+    that leads to it in a flat row-major policy of the given width, where rows maps arena information
+    set rows to the policy's own rows; -1 for all other nodes.
+    Actions are indexed by value as in FullCFR.calc_cfr, so a pass action of -1 uses the last column.
+    """
+    index = np.full(arena.n_nodes, -1, dtype=np.int64)
+    parent_info_set = np.full(arena.n_nodes, -1, dtype=np.int64)
+    parent_info_set[1:] = arena.info_set[arena.parent[1:]]
+    edges = np.nonzero(parent_info_set >= 0)[0]
+    index[edges] = rows[parent_info_set[edges]] * width + arena.action[edges] % width
+    return index
+
+
+class ArenaPolicyBinding(ABC):
+    """
+    Presents a policy's storage to the arena solvers as flat vectors, with one entry per
+    (information set, action), so a solver can work with whole arrays whatever the policy layout.
+    """
+    # number of entries in the flat vectors
+    size: int
+    # per arena node, the flat entry of the decision edge leading to the node, or -1
+    edge_index: npt.NDArray
+
+    @abstractmethod
+    def current(self) -> npt.NDArray:
+        """The current policy as a flat vector"""
+        pass
+
+    @abstractmethod
+    def average(self) -> npt.NDArray:
+        """The average policy as a flat vector"""
+        pass
+
+    @abstractmethod
+    def add_regrets(self, delta: npt.NDArray) -> None:
+        pass
+
+    @abstractmethod
+    def update(self, step: int) -> None:
+        pass
+
+
+class TabularPolicyBinding(ArenaPolicyBinding):
+    def __init__(self, arena: GameTreeArena, policy: InfoSetTabularPolicy):
+        self.policy = policy
+        self.keys = arena.info_set_ids if policy.int_keys else arena.info_set_keys
+        self.width = arena.width
+        if policy.int_keys:
+            policy.labels.update(zip(arena.info_set_ids, arena.info_set_keys))
+        # create the rows up front, just as the first calc_cfr pass would
+        for key in self.keys:
+            policy.p_actions(key, self.width)
+        self.size = len(self.keys) * self.width
+        self.edge_index = decision_edge_index(arena, np.arange(len(self.keys)), self.width)
+
+    def current(self) -> npt.NDArray:
+        if not self.keys:
+            return np.zeros(0)
+        return np.concatenate([self.policy.p_action_dict[key] for key in self.keys])
+
+    def average(self) -> npt.NDArray:
+        if not self.keys:
+            return np.zeros(0)
+        return np.concatenate([self.policy.policy_dict[key] for key in self.keys])
+
+    def add_regrets(self, delta: npt.NDArray) -> None:
+        for key, row in zip(self.keys, delta.reshape(-1, self.width)):
+            self.policy.regret_dict[key] += row
+
+    def update(self, step: int) -> None:
+        self.policy.update(step)
+
+
+class MyPolicyBinding(ArenaPolicyBinding):
+    def __init__(self, arena: GameTreeArena, policy: MyPolicy):
+        self.policy = policy
+        rows = np.array([policy.index(key) for key in arena.info_set_keys], dtype=np.int64)
+        self.size = policy.regrets.size
+        self.edge_index = decision_edge_index(arena, rows, policy.n_actions)
+
+    def current(self) -> npt.NDArray:
+        return self.policy.curr_policy.ravel()
+
+    def average(self) -> npt.NDArray:
+        return self.policy.policy.ravel()
+
+    def add_regrets(self, delta: npt.NDArray) -> None:
+        self.policy.regrets += delta.reshape(self.policy.regrets.shape)
+
+    def update(self, step: int) -> None:
+        self.policy.update(step)
+
+
+class PackedPolicyBinding(ArenaPolicyBinding):
+    def __init__(self, arena: GameTreeArena, policy: PackedTabularPolicy):
+        self.policy = policy
+        keys = arena.info_set_ids if policy.int_keys else arena.info_set_keys
+        if policy.int_keys:
+            policy.labels.update(zip(arena.info_set_ids, arena.info_set_keys))
+        rows = np.array([policy.row(key, arena.width) for key in keys], dtype=np.int64)
+        # the tables must not grow after this, as the flat views below would go stale
+        self.size = policy.regret_table.size
+        self.edge_index = decision_edge_index(arena, rows, arena.width)
+
+    def current(self) -> npt.NDArray:
+        return self.policy.current_table.ravel()
+
+    def average(self) -> npt.NDArray:
+        return self.policy.average_table.ravel()
+
+    def add_regrets(self, delta: npt.NDArray) -> None:
+        self.policy.regret_table += delta.reshape(self.policy.regret_table.shape)
+
+    def update(self, step: int) -> None:
+        self.policy.update(step)
+
+
+class SegmentedPolicyBinding(ArenaPolicyBinding):
+    def __init__(self, arena: GameTreeArena, policy: SegmentedTabularPolicy):
+        self.policy = policy
+        keys = arena.info_set_ids if policy.int_keys else arena.info_set_keys
+        rows = np.array([policy.index[key] for key in keys], dtype=np.int64)
+        self.size = len(policy.actions)
+        self.edge_index = np.full(arena.n_nodes, -1, dtype=np.int64)
+        parent_info_set = np.full(arena.n_nodes, -1, dtype=np.int64)
+        parent_info_set[1:] = arena.info_set[arena.parent[1:]]
+        edges = np.nonzero(parent_info_set >= 0)[0]
+        self.edge_index[edges] = policy.entry_index(rows[parent_info_set[edges]], arena.action[edges], arena.width)
+
+    def current(self) -> npt.NDArray:
+        return self.policy.current
+
+    def average(self) -> npt.NDArray:
+        return self.policy.average
+
+    def add_regrets(self, delta: npt.NDArray) -> None:
+        self.policy.regrets += delta
+
+    def update(self, step: int) -> None:
+        self.policy.update(step)
+
+
+def bind_policy(arena: GameTreeArena, policy: Union[InfoSetTabularPolicy, MyPolicy]) -> ArenaPolicyBinding:
+    if isinstance(policy, SegmentedTabularPolicy):
+        return SegmentedPolicyBinding(arena, policy)
+    elif isinstance(policy, PackedTabularPolicy):
+        return PackedPolicyBinding(arena, policy)
+    elif isinstance(policy, InfoSetTabularPolicy):
+        return TabularPolicyBinding(arena, policy)
+    elif isinstance(policy, MyPolicy):
+        return MyPolicyBinding(arena, policy)
+    raise TypeError(f"No arena binding for policy type {type(policy).__name__}")
+
+
+class ArenaCFR:
+    """
+    Vanilla CFR over a compiled GameTreeArena, one depth at a time: reach probabilities are propagated top-down
+    with a gather from each level's parents, values are accumulated bottom-up with an np.add.at scatter into the
+    level above, and the regrets go into the policy in a single scatter. The work per iteration is a few NumPy
+    calls per depth, and it gives the same updates as FullCFR.calc_cfr in simpler_cfr.py.
+    """
+
+    def __init__(self, arena: GameTreeArena, binding: ArenaPolicyBinding):
+        self.arena = arena
+        self.binding = binding
+        self.n_players = arena.n_players
+        self.levels = [arena.level(depth) for depth in range(1, arena.max_depth + 1)]
+        self.parent = arena.parent.astype(np.int64)
+        # reach columns are the players followed by chance, so Player.CHANCE (-1) picks the last column
+        self.reach_column = (arena.parent_player() % (self.n_players + 1)).astype(np.int64)
+        self.decision_edges = np.nonzero(binding.edge_index >= 0)[0]
+        self.decision_parents = arena.parent[self.decision_edges]
+        self.decision_players = arena.player[self.decision_parents].astype(np.int64)
+
+    def edge_probs(self) -> npt.NDArray:
+        """The probability of the action leading to each node under the current policy (or chance)"""
+        probs = self.arena.chance_prob.copy()
+        probs[self.decision_edges] = self.binding.current()[self.binding.edge_index[self.decision_edges]]
+        return probs
+
+    def reach_probs(self, edge_probs: npt.NDArray) -> npt.NDArray:
+        """Top-down pass: reach probability of every node for each player and chance"""
+        reach = np.ones((self.arena.n_nodes, self.n_players + 1))
+        for level in self.levels:
+            nodes = np.arange(level.start, level.stop)
+            reach[level] = reach[self.parent[level]]
+            reach[nodes, self.reach_column[level]] *= edge_probs[level]
+        return reach
+
+    def values(self, edge_probs: npt.NDArray) -> npt.NDArray:
+        """Bottom-up pass: expected utility of every node for each player"""
+        values = self.arena.utilities.copy()
+        for level in reversed(self.levels):
+            np.add.at(values, self.parent[level], edge_probs[level, None] * values[level])
+        return values
+
+    def regret_deltas(self, reach: npt.NDArray, values: npt.NDArray) -> npt.NDArray:
+        # counterfactual reach excludes the acting player, who is assumed to play to reach the node
+        parents = self.decision_parents
+        players = self.decision_players
+        others = reach[parents]
+        others[np.arange(len(parents)), players] = 1.0
+        cf_reach = np.prod(others, axis=1)
+        regrets = cf_reach * (values[self.decision_edges, players] - values[parents, players])
+        delta = np.zeros(self.binding.size)
+        np.add.at(delta, self.binding.edge_index[self.decision_edges], regrets)
+        return delta
+
+    def iteration(self, step: int) -> npt.NDArray:
+        """Runs one CFR iteration, updating the policy; returns the value of the root for each player"""
+        edge_probs = self.edge_probs()
+        reach = self.reach_probs(edge_probs)
+        values = self.values(edge_probs)
+        self.binding.add_regrets(self.regret_deltas(reach, values))
+        self.binding.update(step)
+        return values[0]
+
+
+def run_arena_cfr(state_factory, n_iterations: int = 100,
+                  policy: Union[InfoSetTabularPolicy, MyPolicy] = None) -> Union[InfoSetTabularPolicy, MyPolicy]:
+    """Like run_easy_cfr, but compiles the game tree once and runs every iteration against the arena"""
+    policy = policy if policy is not None else InfoSetTabularPolicy()
+    arena = compile_game_tree(state_factory())
+    arena_logger.info(f"{arena.n_nodes=}, {arena.n_info_sets=}, {arena.max_depth=}")
+    solver = ArenaCFR(arena, bind_policy(arena, policy))
+    for step in range(n_iterations):
+        values = solver.iteration(step)
+        print(f"{step=}, {values=}")
+    return policy
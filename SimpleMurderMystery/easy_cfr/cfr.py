@@ -9,6 +9,7 @@ import numpy.typing as npt
 
 from easy_cfr.game_and_agent_interfaces import GameModel, Player, PlayerInterface
 from easy_cfr.policy_player import MyPolicy
+from easy_cfr.tree_walk import walk_tree
 
 np.set_printoptions(precision=3, suppress=True, floatmode='fixed')
 
@@ -51,50 +52,67 @@ class FullCFR:
 
     def calc_cfr(self, state: GameModel, reach: npt.NDArray) -> npt.NDArray:
         """Updates regrets; returns utility for all players."""
+        # the state is walked in place by walk_tree, with the reach vector passed down to each child
+        return walk_tree(state, self.enter, self.leave, reach)
+
+    def enter(self, state: GameModel, reach: npt.NDArray):
+        """Sets up a node on the way down: returns its context and the reach of each child."""
         if state.is_terminal():
-            return state.returns()
+            return None, ()
         elif state.current_player() == Player.CHANCE:
             # print(state.chance_action_probs())
-            return sum(prob * self.calc_cfr(state.child(action), self.new_reach(reach, Player.CHANCE, prob))
-                       for action, prob in state.chance_action_probs())
-        else:
-            # We are at a player decision point.
-            player = state.current_player()
-            index = self.policy.index(state.information_set())
-            inf_set = state.information_set()
-            # Compute utilities after each action, updating regrets deeper in the tree.
-            utility = np.zeros((self.n_actions, self.n_players))
-            curr_policy = self.policy.curr_policy
-            regrets = self.policy.regrets
-
-            # iterate over all the actions, setting the utility for each one
-            for action in state.actions():
-                # index is the index for this information set, so it's really not needed here if we just looked it up
-                # directly from the InformationSet hash value of the state - just return it as a string for now
-
-                # prob is a scalar: the probability this policy will choose this 'action' at infoset 'index'
-                cfr_logger.info(curr_policy)
-                prob = curr_policy[index][action]
-
-                # the utility is vector of utilities for each player, given this action
-                utility[action] = self.calc_cfr(state.child(action), self.new_reach(reach, player, prob))
-
-            # Compute regrets at this state.
-            # the reach vector is the probability that each player played to get here
-            # but for the current state we exclude the current player, who is assumed to have played that move intentionally with p=1
-            cfr_prob = np.prod(reach[:player]) * np.prod(reach[player + 1:])
-
-            # the value is a vector with the value for each player calculated by mutiplying the utility by the probability of selecting the action
-            # value = [u * p for player in range()]
-            policy_vec = curr_policy[index]
-            value = [sum(utility[action][player] * policy_vec[action] for action in state.actions()) for player in
-                     range(self.n_players)]
-            value = np.array(value)
-            # value = np.einsum('ap,a->p', utility, curr_policy[index])
-            cfr_logger.info(f"{value=}")
-            for action in state.actions():
-                regrets[index][action] += cfr_prob * (utility[action][player] - value[player])
-
-            # Return the value of this state for all players.
+            action_probs = state.chance_action_probs()
+            edges = [(action, self.new_reach(reach, Player.CHANCE, prob)) for action, prob in action_probs]
+            return (Player.CHANCE, None, None, [prob for _, prob in action_probs], reach), edges
+        # We are at a player decision point.
+        player = state.current_player()
+        index = self.policy.index(state.information_set())
+        curr_policy = self.policy.curr_policy
+        actions = state.actions()
+        edges = []
+        for action in actions:
+            # index is the index for this information set, so it's really not needed here if we just looked it up
+            # directly from the InformationSet hash value of the state - just return it as a string for now
+
+            # prob is a scalar: the probability this policy will choose this 'action' at infoset 'index'
+            cfr_logger.info(curr_policy)
+            prob = curr_policy[index][action]
+            edges.append((action, self.new_reach(reach, player, prob)))
+        return (player, index, actions, None, reach), edges
+
+    def leave(self, state: GameModel, context, child_values: List[npt.NDArray]) -> npt.NDArray:
+        """Updates the regrets at a node on the way back up; returns its utility for all players."""
+        if context is None:
+            return state.returns()
+        player, index, actions, chance_probs, reach = context
+        if player == Player.CHANCE:
+            value = 0
+            for prob, child_value in zip(chance_probs, child_values):
+                value += prob * child_value
             return value
 
+        # the utility is vector of utilities for each player, given this action
+        utility = np.zeros((self.n_actions, self.n_players))
+        for action, child_value in zip(actions, child_values):
+            utility[action] = child_value
+        curr_policy = self.policy.curr_policy
+        regrets = self.policy.regrets
+
+        # Compute regrets at this state.
+        # the reach vector is the probability that each player played to get here
+        # but for the current state we exclude the current player, who is assumed to have played that move intentionally with p=1
+        cfr_prob = np.prod(reach[:player]) * np.prod(reach[player + 1:])
+
+        # the value is a vector with the value for each player calculated by mutiplying the utility by the probability of selecting the action
+        # value = [u * p for player in range()]
+        policy_vec = curr_policy[index]
+        value = [sum(utility[action][player] * policy_vec[action] for action in actions) for player in
+                 range(self.n_players)]
+        value = np.array(value)
+        # value = np.einsum('ap,a->p', utility, curr_policy[index])
+        cfr_logger.info("value=%r", value)
+        for action in actions:
+            regrets[index][action] += cfr_prob * (utility[action][player] - value[player])
+
+        # Return the value of this state for all players.
+        return value
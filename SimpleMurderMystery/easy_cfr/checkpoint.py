@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.policy_player import MyPolicy
+
+
+# Everything needed to continue a CFR run: one row per information set in each of the three tables, in the
+# policy's own row order, plus the number of the next iteration to run and, for runs that sample, the state of
+# the random number generator.
+class Checkpoint(NamedTuple):
+    keys: List[Union[str, int]]
+    # display strings for integer information set keys, empty otherwise
+    labels: List[str]
+    int_keys: bool
+    regrets: npt.NDArray
+    current: npt.NDArray
+    average: npt.NDArray
+    next_step: int
+    # only set for MyPolicy checkpoints
+    n_players: Optional[int] = None
+    # random.Random.getstate() of the chance sampling, only set for runs that sample
+    rng_state: Optional[tuple] = None
+
+
+def policy_tables(policy) -> Tuple[List[Union[str, int]], npt.NDArray, npt.NDArray, npt.NDArray]:
+    """The keys and the regret, current and average tables of a MyPolicy or an InfoSetTabularPolicy"""
+    if isinstance(policy, MyPolicy):
+        keys = sorted(policy.info_sets, key=policy.info_sets.get)
+        return keys, policy.regrets, policy.curr_policy, policy.policy
+    keys = list(policy.policy_dict)
+    if hasattr(policy, "regret_table"):
+        # a PackedTabularPolicy already holds its rows in contiguous tables, in key order
+        n = policy.n_rows
+        return keys, policy.regret_table[:n], policy.current_table[:n], policy.average_table[:n]
+    if not keys:
+        empty = np.zeros((0, 0))
+        return keys, empty, empty, empty
+    regrets = np.array([policy.regret_dict[key] for key in keys])
+    current = np.array([policy.p_action_dict[key] for key in keys])
+    average = np.array([policy.policy_dict[key] for key in keys])
+    return keys, regrets, current, average
+
+
+def save_checkpoint(path: str, policy, next_step: int, rng_state: Optional[tuple] = None) -> None:
+    """
+    Writes the policy tables to an uncompressed .npz file. The file is written next to path and then
+    renamed over it, so a crash part way through leaves the previous checkpoint intact.
+    """
+    keys, regrets, current, average = policy_tables(policy)
+    int_keys = getattr(policy, "int_keys", False)
+    arrays = dict(regrets=regrets, current=current, average=average, next_step=np.int64(next_step),
+                  int_keys=np.bool_(int_keys))
+    if int_keys:
+        arrays["keys"] = np.array(keys, dtype=np.uint64)
+        arrays["labels"] = np.array([policy.labels.get(key, "") for key in keys], dtype=str)
+    else:
+        arrays["keys"] = np.array(keys, dtype=str)
+    if isinstance(policy, MyPolicy):
+        arrays["n_players"] = np.int64(policy.n_players)
+    if rng_state is not None:
+        version, internal, gauss_next = rng_state
+        arrays["rng_version"] = np.int64(version)
+        arrays["rng_internal"] = np.array(internal, dtype=np.uint64)
+        arrays["rng_gauss_next"] = np.float64(np.nan if gauss_next is None else gauss_next)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def saved_rng_state(data) -> Optional[tuple]:
+    if "rng_internal" not in data:
+        return None
+    gauss_next = float(data["rng_gauss_next"])
+    return (int(data["rng_version"]), tuple(int(x) for x in data["rng_internal"]),
+            None if np.isnan(gauss_next) else gauss_next)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    with np.load(path) as data:
+        return Checkpoint(
+            keys=data["keys"].tolist(),
+            labels=data["labels"].tolist() if "labels" in data else [],
+            int_keys=bool(data["int_keys"]),
+            regrets=data["regrets"],
+            current=data["current"],
+            average=data["average"],
+            next_step=int(data["next_step"]),
+            n_players=int(data["n_players"]) if "n_players" in data else None,
+            rng_state=saved_rng_state(data),
+        )
+
+
+def restore_tabular_policy(checkpoint: Checkpoint, policy):
+    """Fills an empty InfoSetTabularPolicy (or subclass) from a checkpoint, keeping the row order"""
+    assert policy.int_keys == checkpoint.int_keys
+    if checkpoint.int_keys:
+        policy.labels.update(zip(checkpoint.keys, checkpoint.labels))
+    width = checkpoint.regrets.shape[1] if checkpoint.keys else 0
+    for i, key in enumerate(checkpoint.keys):
+        policy.p_actions(key, width)[:] = checkpoint.current[i]
+        policy.regrets(key)[:] = checkpoint.regrets[i]
+        policy.policy_dict[key][:] = checkpoint.average[i]
+    return policy
+
+
+def restore_my_policy(checkpoint: Checkpoint) -> MyPolicy:
+    info_sets = {key: i for i, key in enumerate(checkpoint.keys)}
+    policy = MyPolicy(info_sets, checkpoint.n_players, n_actions=checkpoint.regrets.shape[1])
+    policy.regrets = checkpoint.regrets.copy()
+    policy.curr_policy = checkpoint.current.copy()
+    policy.policy = checkpoint.average.copy()
+    return policy
+
+
+class Checkpointer:
+    """Saves a checkpoint when at least interval seconds have passed since the last one"""
+
+    def __init__(self, path: Optional[str], interval: float = 10.0) -> None:
+        self.path = path
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+    def maybe_save(self, policy, next_step: int, force: bool = False, rng_state: Optional[tuple] = None) -> bool:
+        if self.path is None:
+            return False
+        if not force and time.monotonic() - self.last_save < self.interval:
+            return False
+        save_checkpoint(self.path, policy, next_step, rng_state)
+        self.last_save = time.monotonic()
+        return True
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from easy_cfr.exploitability import best_response
+from easy_cfr.game_and_agent_interfaces import GameModel
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy, run_easy_cfr, CFRVariant, DCFRParams
+
+
+class ConvergencePoint(NamedTuple):
+    # iterations completed
+    iteration: int
+    # seconds since the monitor was created
+    wall_time: float
+    exploitability: float
+    # largest change in any average policy entry since the previous check, inf on the first check
+    policy_change: float
+
+
+class StoppingCriteria(NamedTuple):
+    # stop once either target is met; with neither set, the run goes to n_iterations and just records the trace
+    target_exploitability: Optional[float] = None
+    target_policy_change: Optional[float] = None
+    # iterations between checks, as a check costs a best response pass per player
+    check_every: int = 10
+
+
+class ConvergenceMonitor:
+    """
+    A run_easy_cfr callback that measures the average policy every criteria.check_every iterations,
+    recording a ConvergencePoint each time, and asks the run to stop when the criteria are met.
+    The game tree is compiled once, when the monitor is created.
+    """
+
+    def __init__(self, state: GameModel, policy: InfoSetTabularPolicy,
+                 criteria: StoppingCriteria = StoppingCriteria()):
+        self.criteria = criteria
+        self.best_response = best_response(state, policy)
+        self.trace: List[ConvergencePoint] = []
+        self.last_average: Optional[np.ndarray] = None
+        self.iterations = 0
+        self.start = time.perf_counter()
+
+    def __call__(self, step: int, policy: InfoSetTabularPolicy) -> bool:
+        self.iterations = step + 1
+        if self.iterations % self.criteria.check_every != 0:
+            return False
+        return self.check()
+
+    def check(self) -> bool:
+        """Records a point for the current average policy; returns True if the criteria are met"""
+        average = self.best_response.binding.average().copy()
+        change = np.inf if self.last_average is None else float(np.max(np.abs(average - self.last_average)))
+        self.last_average = average
+        exploitability = self.best_response.exploitability()
+        point = ConvergencePoint(self.iterations, time.perf_counter() - self.start, exploitability, change)
+        self.trace.append(point)
+        return self.meets_criteria(point)
+
+    def meets_criteria(self, point: ConvergencePoint) -> bool:
+        target_exploitability = self.criteria.target_exploitability
+        target_policy_change = self.criteria.target_policy_change
+        return (target_exploitability is not None and point.exploitability <= target_exploitability) or \
+               (target_policy_change is not None and point.policy_change <= target_policy_change)
+
+
+def run_until_converged(state_factory, max_iterations: int = 1000,
+                        criteria: StoppingCriteria = StoppingCriteria(target_exploitability=1e-3),
+                        int_keys: bool = False,
+                        policy: Optional[InfoSetTabularPolicy] = None,
+                        variant: CFRVariant = CFRVariant.VANILLA,
+                        dcfr_params: DCFRParams = DCFRParams(),
+                        verbose: bool = False) -> Tuple[InfoSetTabularPolicy, List[ConvergencePoint]]:
+    """
+    Runs run_easy_cfr until the criteria are met or max_iterations is reached; returns the policy and the
+    convergence trace, which always ends with a point for the final policy
+    """
+    policy = policy if policy is not None else InfoSetTabularPolicy(int_keys)
+    monitor = ConvergenceMonitor(state_factory(), policy, criteria)
+    run_easy_cfr(state_factory, max_iterations, policy=policy, variant=variant, dcfr_params=dcfr_params,
+                 callback=monitor, verbose=verbose)
+    if not monitor.trace or monitor.trace[-1].iteration != monitor.iterations:
+        monitor.check()
+    return policy, monitor.trace
+
+
+if __name__ == '__main__':
+    params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=4, max_turns=7)
+    _, trace = run_until_converged(partial(MurderGameModel, params), 1000,
+                                   StoppingCriteria(target_exploitability=0.1, check_every=20),
+                                   variant=CFRVariant.CFR_PLUS)
+    for point in trace:
+        print(point)
@@ -1,38 +1,142 @@
 from functools import partial
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
 
-from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.game_and_agent_interfaces import GameModel, Player, PlayerInterface
 from easy_cfr.kuhn_poker import KuhnPoker
 from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
 
 from easy_cfr.policy_utils import PolicyPlayer, get_policy_player
+from easy_cfr.tree_walk import walk_tree
 
 
 def evaluate(state: GameModel, player: PolicyPlayer, opponent: PolicyPlayer, player_role: int):
-    if state.is_terminal():
-        return state.returns()[player_role]
-    elif state.current_player() == player_role:
-        ap = player.get_action_probs(state)
-    elif state.current_player() == Player.CHANCE:
-        ap = state.chance_action_probs()
-    else:
-        ap = opponent.get_action_probs(state)
-    return sum(p * evaluate(state.child(a), player, opponent, player_role) for a, p in ap)
+    def enter(state: GameModel, _):
+        if state.is_terminal():
+            return None, ()
+        elif state.current_player() == player_role:
+            ap = player.get_action_probs(state)
+        elif state.current_player() == Player.CHANCE:
+            ap = state.chance_action_probs()
+        else:
+            ap = opponent.get_action_probs(state)
+        return [p for _, p in ap], [(a, None) for a, _ in ap]
+
+    def leave(state: GameModel, probs: Optional[List[float]], values: List[float]) -> float:
+        if probs is None:
+            return state.returns()[player_role]
+        total = 0
+        for p, value in zip(probs, values):
+            total += p * value
+        return total
+
+    # walk the state in place rather than copying it for every child
+    return walk_tree(state, enter, leave)
+
+
+def evaluate_both_roles(state: GameModel, player: PlayerInterface, opponent: PlayerInterface,
+                        cache: Optional[Dict[Hashable, Tuple[float, float]]] = None,
+                        state_key: Callable[[GameModel], Hashable] = str) -> Tuple[float, float]:
+    """
+    The values to player of playing as player 0 and as player 1 against opponent, from a single walk of the tree
+    that follows both matches down each branch that either of them can reach. With a cache, the value of each
+    expanded subgame is stored under (id(player), id(opponent), state_key(state)), and cached subgames aren't
+    walked again.
+    """
+    def enter(state: GameModel, _):
+        if state.is_terminal():
+            returns = state.returns()
+            return (None, None, (returns[0], returns[1])), ()
+        key = None
+        if cache is not None:
+            key = (id(player), id(opponent), state_key(state))
+            cached = cache.get(key)
+            if cached is not None:
+                return (None, None, cached), ()
+        current = state.current_player()
+        if current == Player.CHANCE:
+            ap_first = ap_second = state.chance_action_probs()
+        else:
+            # in the first match player is player 0, in the second player 1
+            ap_first = (player if current == 0 else opponent).get_action_probs(state)
+            ap_second = (opponent if current == 0 else player).get_action_probs(state)
+        p_first = dict(ap_first)
+        p_second = dict(ap_second)
+        probs = []
+        for a in dict.fromkeys([a for a, _ in ap_first] + [a for a, _ in ap_second]):
+            pf = p_first.get(a, 0)
+            ps = p_second.get(a, 0)
+            if pf == 0 and ps == 0:
+                continue
+            probs.append((a, pf, ps))
+        return (key, probs, None), [(a, None) for a, _, _ in probs]
+
+    def leave(state: GameModel, context, child_values: List[Tuple[float, float]]) -> Tuple[float, float]:
+        key, probs, value = context
+        if probs is None:
+            # a terminal or a cached value
+            return value
+        first, second = 0, 0
+        for (_, pf, ps), (child_first, child_second) in zip(probs, child_values):
+            first += pf * child_first
+            second += ps * child_second
+        if cache is not None:
+            cache[key] = (first, second)
+        return first, second
+
+    return walk_tree(state, enter, leave)
 
 
-def eval(state_factory, player: PolicyPlayer, opponent: PolicyPlayer):
-    results = (evaluate(state_factory(), player, opponent, player_role=0),
-               + evaluate(state_factory(), player, opponent, player_role=1))
+class MemoizedEvaluator:
+    """
+    evaluate_both_roles with a cache of subgame values that is kept between calls, keyed on the pair of players and
+    state_key(state). The players' information sets record the whole move history, so the key has to identify
+    the history and not just the people alive, dead and accused; str(state) does this for the murder game and
+    Kuhn poker. Within one walk the cache never hits, so it only pays off for repeat evaluations of the same pair,
+    e.g. print_eval after eval, at the cost of an entry per node.
+    The cache assumes the players' policies don't change: call clear() if they do.
+    """
+
+    def __init__(self, state_key: Callable[[GameModel], Hashable] = str):
+        self.state_key = state_key
+        self.cache: Dict[Tuple[int, int, Hashable], Tuple[float, float]] = {}
+        # holds on to the players in the cache keys, so that their ids can't be reused
+        self.players: Dict[int, PlayerInterface] = {}
+        self.n_expanded = 0
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.players.clear()
+
+    def evaluate(self, state: GameModel, player: PlayerInterface, opponent: PlayerInterface) -> Tuple[float, float]:
+        """The values to player of playing as player 0 and as player 1 against opponent"""
+        self.players[id(player)] = player
+        self.players[id(opponent)] = opponent
+        n_cached = len(self.cache)
+        values = evaluate_both_roles(state, player, opponent, self.cache, self.state_key)
+        # every subgame walked adds an entry
+        self.n_expanded += len(self.cache) - n_cached
+        return values
+
+
+def eval(state_factory, player: PolicyPlayer, opponent: PolicyPlayer,
+         evaluator: Optional[MemoizedEvaluator] = None):
+    # pass in an evaluator to keep a cache of the subgame values between calls; without one nothing is cached
+    if evaluator is not None:
+        results = evaluator.evaluate(state_factory(), player, opponent)
+    else:
+        results = evaluate_both_roles(state_factory(), player, opponent)
     print(f"{results=}")
     return sum(results)
 
 
-def print_eval(state_factory, player: PolicyPlayer, opponent: PolicyPlayer) -> None:
+def print_eval(state_factory, player: PolicyPlayer, opponent: PolicyPlayer,
+               evaluator: Optional[MemoizedEvaluator] = None) -> None:
     print("Policy =:")
     print(player.policy)
     print("Opponent =:")
     print(opponent.policy)
     print()
-    score = eval(state_factory, player, opponent)
+    score = eval(state_factory, player, opponent, evaluator)
     print(f"{score=}")
     print()
 
@@ -54,5 +158,6 @@ if __name__ == '__main__':
     print()
     print("Random player", random_player.policy)
     print(f"{state_factory=}")
-    print_eval(state_factory, policy_player, random_player)
-    print_eval(state_factory, policy_player, random_player)
+    evaluator = MemoizedEvaluator()
+    print_eval(state_factory, policy_player, random_player, evaluator)
+    print_eval(state_factory, policy_player, random_player, evaluator)
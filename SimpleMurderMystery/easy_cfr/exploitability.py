@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.arena_cfr import ArenaPolicyBinding, bind_policy
+from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.game_tree_arena import GameTreeArena, compile_game_tree
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.policy_player import MyPolicy
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy, run_easy_cfr
+
+
+class BestResponse:
+    """
+    Best responses to the average policy of a bound policy, computed over a compiled GameTreeArena.
+    For each player, a top-down pass gives the reach probability of the other players and chance, and a single
+    bottom-up pass, one depth level at a time, sums the reach-weighted values of the best response: at the
+    responder's nodes, the action values are totalled over all the histories in the information set and the best
+    action is followed. This needs every history of an information set to be at the same depth, which holds
+    when the information set records the moves so far, as in the murder game and Kuhn poker.
+    Build it once and call nash_conv() as often as needed, e.g. every N iterations of a solve.
+    """
+
+    def __init__(self, arena: GameTreeArena, binding: ArenaPolicyBinding):
+        self.arena = arena
+        self.binding = binding
+        self.n_players = arena.n_players
+        decision = arena.info_set >= 0
+        first_depth = np.full(arena.n_info_sets, arena.max_depth + 1)
+        last_depth = np.full(arena.n_info_sets, -1)
+        np.minimum.at(first_depth, arena.info_set[decision], arena.depth[decision])
+        np.maximum.at(last_depth, arena.info_set[decision], arena.depth[decision])
+        if np.any(first_depth != last_depth):
+            raise ValueError("information sets span several depths, so can't be resolved level by level")
+        self.parent = arena.parent.astype(np.int64)
+        self.parent_player = arena.parent_player()
+        self.columns = arena.action % arena.width
+        self.parent_info_set = np.full(arena.n_nodes, -1, dtype=np.int64)
+        self.parent_info_set[1:] = arena.info_set[self.parent[1:]]
+        self.decision_edges = np.nonzero(binding.edge_index >= 0)[0]
+        self.terminals = np.nonzero(arena.player == Player.TERMINAL)[0]
+
+    def edge_probs(self) -> npt.NDArray:
+        """
+        The probability of the action leading to each node under the average policy (or chance). The policy
+        is renormalised over the legal actions at each node, as padded rows can hold mass on illegal columns.
+        """
+        probs = self.arena.chance_prob.copy()
+        edges = self.decision_edges
+        probs[edges] = self.binding.average()[self.binding.edge_index[edges]]
+        totals = np.zeros(self.arena.n_nodes)
+        np.add.at(totals, self.parent[edges], probs[edges])
+        edge_totals = totals[self.parent[edges]]
+        uniform = 1 / self.arena.n_children[self.parent[edges]]
+        probs[edges] = np.where(edge_totals > 0, probs[edges] / np.where(edge_totals > 0, edge_totals, 1), uniform)
+        return probs
+
+    def policy_values(self, edge_probs: Optional[npt.NDArray] = None) -> npt.NDArray:
+        """The expected utility for each player when everyone follows the average policy"""
+        probs = self.edge_probs() if edge_probs is None else edge_probs
+        reach = np.ones(self.arena.n_nodes)
+        for depth in range(1, self.arena.max_depth + 1):
+            level = self.arena.level(depth)
+            reach[level] = reach[self.parent[level]] * probs[level]
+        terminals = self.terminals
+        return reach[terminals] @ self.arena.utilities[terminals]
+
+    def best_response_value(self, player: int, edge_probs: Optional[npt.NDArray] = None) -> float:
+        """The expected utility for player of a best response to the other players' average policy"""
+        arena = self.arena
+        probs = self.edge_probs() if edge_probs is None else edge_probs
+        responder_edge = self.parent_player == player
+        responder_edge[0] = False
+        other_reach = np.ones(arena.n_nodes)
+        factor = np.where(responder_edge, 1.0, probs)
+        for depth in range(1, arena.max_depth + 1):
+            level = arena.level(depth)
+            other_reach[level] = other_reach[self.parent[level]] * factor[level]
+
+        values = np.zeros(arena.n_nodes)
+        terminals = self.terminals
+        values[terminals] = other_reach[terminals] * arena.utilities[terminals, player]
+        action_values = np.zeros((arena.n_info_sets, arena.width))
+        for depth in range(arena.max_depth, 0, -1):
+            nodes = np.arange(arena.level_offsets[depth], arena.level_offsets[depth + 1])
+            responder = responder_edge[nodes]
+            others = nodes[~responder]
+            np.add.at(values, self.parent[others], values[others])
+            children = nodes[responder]
+            if len(children) == 0:
+                continue
+            rows = self.parent_info_set[children]
+            columns = self.columns[children]
+            np.add.at(action_values, (rows, columns), values[children])
+            # each history follows its best legal action by the information set's totals
+            scores = action_values[rows, columns]
+            parents = self.parent[children]
+            best = np.full(arena.n_nodes, -np.inf)
+            np.maximum.at(best, parents, scores)
+            candidates = children[scores == best[parents]]
+            _, first = np.unique(self.parent[candidates], return_index=True)
+            chosen = candidates[first]
+            values[self.parent[chosen]] = values[chosen]
+        return float(values[0])
+
+    def nash_conv(self) -> float:
+        """The total gain over all players from switching to a best response"""
+        probs = self.edge_probs()
+        policy_values = self.policy_values(probs)
+        return float(sum(self.best_response_value(player, probs) - policy_values[player]
+                         for player in range(self.n_players)))
+
+    def exploitability(self) -> float:
+        return self.nash_conv() / self.n_players
+
+
+def best_response(state: GameModel, policy: Union[InfoSetTabularPolicy, MyPolicy],
+                  arena: Optional[GameTreeArena] = None) -> BestResponse:
+    """Compiles the tree below state, unless an arena is given, and binds the policy to it"""
+    arena = arena if arena is not None else compile_game_tree(state)
+    return BestResponse(arena, bind_policy(arena, policy))
+
+
+def nash_conv(state: GameModel, policy: Union[InfoSetTabularPolicy, MyPolicy]) -> float:
+    return best_response(state, policy).nash_conv()
+
+
+def exploitability(state: GameModel, policy: Union[InfoSetTabularPolicy, MyPolicy]) -> float:
+    return best_response(state, policy).exploitability()
+
+
+if __name__ == '__main__':
+    params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=4, max_turns=7)
+    model_factory = partial(MurderGameModel, params)
+    for n_iterations in [1, 10, 100]:
+        policy = run_easy_cfr(model_factory, n_iterations)
+        print(f"{n_iterations=}, nash_conv={nash_conv(model_factory(), policy)}")
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import copy
 import random
 from abc import ABC, abstractmethod
 
 from enum import Enum, IntEnum
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
+
+from easy_cfr.info_set_keys import stable_hash
 
 
 class Player(IntEnum):
@@ -55,6 +58,46 @@ class GameModel(ABC):
         cp.act(action)
         return cp
 
+    def undo_stack(self) -> List:
+        # created lazily so that implementations don't need to call a base class constructor
+        if "_undo_records" not in self.__dict__:
+            self._undo_records = []
+        return self._undo_records
+
+    def state_dict(self) -> dict:
+        # the instance attributes without the undo records, which belong to this instance's history, not its state
+        return {k: v for k, v in self.__dict__.items() if k != "_undo_records"}
+
+    def deepcopy_state(self, shared: Iterable = ()) -> GameModel:
+        """
+        A deepcopy for copy_state() that leaves out the undo records, so the copy starts with an empty undo stack
+        and undo() on it fails rather than rewinding moves it never made.
+        The objects in shared, e.g. lookup tables that never change, are referenced by the copy, not copied.
+        """
+        memo = {id(obj): obj for obj in shared}
+        cp = self.__class__.__new__(self.__class__)
+        cp.__dict__.update(copy.deepcopy(self.state_dict(), memo))
+        return cp
+
+    def apply(self, action: int) -> None:
+        """
+        Plays action in place, pushing an undo record so that undo() restores the current state.
+        Tree walks use apply / undo rather than child() to avoid copying the state for every edge.
+        This fallback records a deepcopy of the state; games should override apply() and undo()
+        to record only what act() changes.
+        """
+        snapshot = copy.deepcopy(self.state_dict())
+        self.undo_stack().append(snapshot)
+        self.act(action)
+
+    def undo(self) -> None:
+        """Reverses the most recent apply()"""
+        stack = self.undo_stack()
+        snapshot = stack.pop()
+        self.__dict__.clear()
+        self.__dict__.update(snapshot)
+        self._undo_records = stack
+
     def chance_outcomes(self) -> List[Tuple[GameModel, float]]:
         assert self.current_player() == Player.CHANCE
         p = 1 / len(self.actions())
@@ -95,3 +138,10 @@ class GameModel(ABC):
     def information_set(self) -> str:
         pass
 
+    def information_set_key(self) -> int:
+        """
+        Integer key that is equal for two states exactly when their information sets are, for use as a
+        cheaper policy key than the information set string. Games should maintain this incrementally in act().
+        """
+        return stable_hash(self.information_set())
+
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.info_set_keys import InfoSetInterner
+from easy_cfr.tree_walk import walk_tree
+
+
+# Structure-of-arrays copy of a whole game tree, so that repeated passes over the tree (e.g. CFR iterations)
+# don't need to go back through GameModel objects to re-derive actions, information sets and returns.
+# Nodes are stored in breadth-first order: every node comes after its parent, the nodes at each depth are
+# contiguous, and so are the children of each node.
+@dataclass
+class GameTreeArena:
+    n_players: int
+    # the widest action row, i.e. max_actions() of the game
+    width: int
+    # per node arrays
+    parent: npt.NDArray  # index of the parent node, -1 for the root
+    depth: npt.NDArray
+    player: npt.NDArray  # Player value of the node: TERMINAL, CHANCE or the acting player
+    info_set: npt.NDArray  # information set row for decision nodes, -1 otherwise
+    action: npt.NDArray  # action taken at the parent to reach this node, -1 for the root
+    chance_prob: npt.NDArray  # probability of that action when the parent is a chance node, 1 otherwise
+    utilities: npt.NDArray  # returns for terminal nodes, zero elsewhere, shape (n_nodes, n_players)
+    first_child: npt.NDArray
+    n_children: npt.NDArray
+    # level_offsets[d]:level_offsets[d + 1] is the slice of nodes at depth d
+    level_offsets: npt.NDArray
+    # per information set row: the information set strings, their integer keys and the acting player
+    info_set_keys: List[str]
+    info_set_ids: List[int]
+    info_set_player: npt.NDArray
+    # CSR layout of the legal actions of each information set: the actions of row r are
+    # info_set_actions[action_offsets[r]:action_offsets[r + 1]], ordered by their column in a padded row.
+    # For games where the legal actions differ between histories in one information set, this is their union.
+    action_offsets: npt.NDArray
+    info_set_actions: npt.NDArray
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.parent)
+
+    @property
+    def n_info_sets(self) -> int:
+        return len(self.info_set_keys)
+
+    @property
+    def max_depth(self) -> int:
+        return len(self.level_offsets) - 2
+
+    def level(self, depth: int) -> slice:
+        return slice(self.level_offsets[depth], self.level_offsets[depth + 1])
+
+    def parent_player(self) -> npt.NDArray:
+        """The player acting at each node's parent, CHANCE for the root"""
+        pp = np.full(self.n_nodes, Player.CHANCE, dtype=self.player.dtype)
+        pp[1:] = self.player[self.parent[1:]]
+        return pp
+
+
+def compile_game_tree(state: GameModel, n_players: int = 2) -> GameTreeArena:
+    """Walks the tree below state once and returns it as a GameTreeArena; state is left unchanged"""
+    interner = InfoSetInterner()
+    info_set_player: List[int] = []
+    parent: List[int] = []
+    depth: List[int] = []
+    player: List[int] = []
+    info_set: List[int] = []
+    action: List[int] = []
+    chance_prob: List[float] = []
+    utilities: Dict[int, List[float]] = {}
+    legal_actions: List[Set[int]] = []
+
+    def visit(state: GameModel, edge: Tuple[int, int, int, float]):
+        parent_ix, d, act, prob = edge
+        ix = len(parent)
+        current = state.current_player()
+        parent.append(parent_ix)
+        depth.append(d)
+        player.append(current)
+        action.append(act)
+        chance_prob.append(prob)
+        if state.is_terminal():
+            info_set.append(-1)
+            utilities[ix] = state.returns()
+            return None, ()
+        if current == Player.CHANCE:
+            info_set.append(-1)
+            edges = state.chance_action_probs()
+        else:
+            row = interner.row(state)
+            if row == len(info_set_player):
+                info_set_player.append(current)
+                legal_actions.append(set())
+            info_set.append(row)
+            edges = [(a, 1.0) for a in state.actions()]
+            legal_actions[row].update(state.actions())
+        return None, [(a, (ix, d + 1, a, p)) for a, p in edges]
+
+    walk_tree(state, visit, data=(-1, 0, -1, 1.0))
+
+    # a stable sort of the depth-first pre-order by depth gives breadth-first order with contiguous siblings
+    depth_arr = np.array(depth, dtype=np.int32)
+    order = np.argsort(depth_arr, kind="stable")
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    old_parent = np.array(parent, dtype=np.int64)[order]
+    new_parent = np.where(old_parent >= 0, new_index[np.maximum(old_parent, 0)], -1).astype(np.int32)
+
+    n_nodes = len(order)
+    utility_arr = np.zeros((n_nodes, n_players))
+    for ix, returns in utilities.items():
+        utility_arr[new_index[ix]] = returns
+
+    first_child = np.full(n_nodes, n_nodes, dtype=np.int32)
+    np.minimum.at(first_child, new_parent[1:], np.arange(1, n_nodes, dtype=np.int32))
+    n_children = np.bincount(new_parent[1:], minlength=n_nodes).astype(np.int32)
+    level_offsets = np.searchsorted(depth_arr[order], np.arange(depth_arr.max() + 2))
+
+    width = state.max_actions()
+    row_actions = [sorted(actions, key=lambda a: a % width) for actions in legal_actions]
+    action_offsets = np.zeros(len(row_actions) + 1, dtype=np.int64)
+    action_offsets[1:] = np.cumsum([len(actions) for actions in row_actions])
+    info_set_actions = np.array([a for actions in row_actions for a in actions], dtype=np.int32)
+
+    return GameTreeArena(
+        n_players=n_players,
+        width=width,
+        parent=new_parent,
+        depth=depth_arr[order],
+        player=np.array(player, dtype=np.int8)[order],
+        info_set=np.array(info_set, dtype=np.int32)[order],
+        action=np.array(action, dtype=np.int32)[order],
+        chance_prob=np.array(chance_prob)[order],
+        utilities=utility_arr,
+        first_child=first_child,
+        n_children=n_children,
+        level_offsets=level_offsets,
+        info_set_keys=interner.labels,
+        info_set_ids=interner.keys,
+        info_set_player=np.array(info_set_player, dtype=np.int8),
+        action_offsets=action_offsets,
+        info_set_actions=info_set_actions,
+    )
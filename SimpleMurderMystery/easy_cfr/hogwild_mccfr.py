@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_and_agent_interfaces import Player
+from easy_cfr.mccfr import MCCFRSampling, MCCFRTables, ExternalSamplingMCCFR, OutcomeSamplingMCCFR
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.packed_policy import RowView
+from easy_cfr.policy_utils import get_info_sets_per_player
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy
+
+hogwild_logger = logging.getLogger(__name__)
+
+c_handler = logging.StreamHandler()
+c_handler.setLevel(logging.DEBUG)
+
+hogwild_logger.addHandler(c_handler)
+
+
+class SharedMCCFRTables(MCCFRTables):
+    """
+    MCCFR tables held in one shared memory block, a regret table and a strategy sum table of shape
+    (n_rows, width), so that several processes can update them in place without locks (Hogwild style:
+    the occasional lost update from a race is tolerated). The rows are fixed up front by the index,
+    e.g. from policy_utils.get_info_sets_per_player, so every process agrees on them.
+    Created with name=None the tables are new and zeroed; otherwise they attach to an existing block.
+    """
+
+    def __init__(self, index: Dict[str, int], width: int, name: Optional[str] = None) -> None:
+        super().__init__()
+        self.index = index
+        self.width = width
+        shape = (2, max(index.values(), default=-1) + 1, width)
+        self.owner = name is None
+        if self.owner:
+            self.shm = SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        else:
+            self.shm = SharedMemory(name=name)
+        tables = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        if self.owner:
+            tables[:] = 0
+        self.regret_table: npt.NDArray = tables[0]
+        self.strategy_table: npt.NDArray = tables[1]
+        self.regret_dict = RowView(self, "regret_table")
+        self.strategy_dict = RowView(self, "strategy_table")
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def regrets(self, key: str, width: int) -> npt.NDArray:
+        return self.regret_table[self.index[key]]
+
+    def strategy_sum(self, key: str, width: int) -> npt.NDArray:
+        return self.strategy_table[self.index[key]]
+
+    def close(self) -> None:
+        # the numpy views must go before the buffer they point into can be closed
+        self.regret_table = self.strategy_table = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _hogwild_worker(state_factory, name: str, index: Dict[str, int], width: int, n_iterations: int,
+                    sampling: MCCFRSampling, seed: Optional[int]) -> float:
+    """Runs in a worker: n_iterations of MCCFR on the shared tables; returns iterations per second"""
+    tables = SharedMCCFRTables(index, width, name)
+    solver_class = ExternalSamplingMCCFR if sampling == MCCFRSampling.EXTERNAL else OutcomeSamplingMCCFR
+    solver = solver_class(state_factory(), tables=tables, seed=seed)
+    rate = solver.run(n_iterations)
+    del solver
+    tables.close()
+    return rate
+
+
+def run_hogwild_mccfr(state_factory, n_iterations: int = 1000, sampling: MCCFRSampling = MCCFRSampling.EXTERNAL,
+                      n_workers: int = 2, seed: Optional[int] = None) -> InfoSetTabularPolicy:
+    """
+    Splits n_iterations of MCCFR between n_workers processes that all update the same shared tables.
+    The information sets are enumerated first, so this suits games whose full tree can be walked once.
+    """
+    state = state_factory()
+    # rows for the decision information sets only, as chance and terminal nodes are never written
+    index: Dict[str, int] = {}
+    for player in [Player.P_ONE, Player.P_TWO]:
+        get_info_sets_per_player(state, index, player)
+    tables = SharedMCCFRTables(index, state.max_actions())
+    try:
+        counts = [n_iterations // n_workers + (i < n_iterations % n_workers) for i in range(n_workers)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(_hogwild_worker, state_factory, tables.name, index, tables.width, count,
+                                       sampling, None if seed is None else seed + i)
+                       for i, count in enumerate(counts)]
+            rates = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        print(f"{n_iterations=}, {n_workers=}, iterations per second={n_iterations / elapsed:.1f}, "
+              f"per worker={[round(rate, 1) for rate in rates]}")
+        solver_class = ExternalSamplingMCCFR if sampling == MCCFRSampling.EXTERNAL else OutcomeSamplingMCCFR
+        policy = solver_class(state, tables=tables).to_policy()
+    finally:
+        tables.close()
+    return policy
+
+
+if __name__ == '__main__':
+    params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=4, max_turns=7)
+    run_hogwild_mccfr(partial(MurderGameModel, params), 20000, MCCFRSampling.OUTCOME, n_workers=4)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from typing import Dict, List
+
+_KEY_BITS = 64
+
+
+def stable_hash(s: str) -> int:
+    """64 bit hash of a string that, unlike hash(), is the same in every process"""
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=_KEY_BITS // 8).digest(), "little")
+
+
+def zobrist_table(name: str, n_rows: int, n_cols: int) -> List[List[int]]:
+    """
+    Random 64 bit keys for Zobrist hashing, one per (row, col), e.g. (move number, action).
+    The generator is seeded from the name and shape so that every process builds the same table.
+    """
+    rng = random.Random(f"{name}-{n_rows}-{n_cols}")
+    return [[rng.getrandbits(_KEY_BITS) for _ in range(n_cols)] for _ in range(n_rows)]
+
+
+class InfoSetInterner:
+    """
+    Maps integer information set keys (GameModel.information_set_key()) to dense row ids.
+    The string form of each information set is built only once, when its row is created, and kept for display.
+    """
+
+    def __init__(self) -> None:
+        self.rows: Dict[int, int] = {}
+        self.keys: List[int] = []
+        self.labels: List[str] = []
+
+    def row(self, state) -> int:
+        key = state.information_set_key()
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            self.rows[key] = row
+            self.keys.append(key)
+            self.labels.append(state.information_set())
+        return row
+
+    def label(self, row: int) -> str:
+        return self.labels[row]
+
+    def __len__(self) -> int:
+        return len(self.keys)
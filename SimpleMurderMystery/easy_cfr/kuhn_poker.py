@@ -1,4 +1,3 @@
-import copy
 from enum import IntEnum
 
 # class KuhnPoker:
@@ -11,10 +10,15 @@ from enum import IntEnum
 from typing import List
 
 from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.info_set_keys import zobrist_table, stable_hash
 
 _DECK = frozenset([0, 1, 2])
 _NUM_PLAYERS = 2
 
+# Zobrist keys per visible card and per (bet number, action); there are at most three bets
+_CARD_KEYS = zobrist_table("kuhn-card", 1, len(_DECK))[0]
+_BET_KEYS = zobrist_table("kuhn-bets", 3, 2)
+
 N_STATE_TRANSITIONS = 0
 
 
@@ -33,6 +37,7 @@ class KuhnPoker(GameModel):
         self.bets = []
         self.pot = [1.0, 1.0]
         self.game_over: bool = False
+        self.bets_key = 0
 
     def is_terminal(self) -> bool:
         return self.game_over
@@ -66,6 +71,7 @@ class KuhnPoker(GameModel):
             assert action in {Action.PASS, Action.BET}
             if action == Action.BET:
                 self.pot[self.current_player()] += 1
+            self.bets_key ^= _BET_KEYS[len(self.bets)][action]
             # this will also advance self.current_player()
             self.bets.append(action)
             if (min(self.pot) == 2 or
@@ -73,6 +79,20 @@ class KuhnPoker(GameModel):
                     len(self.bets) == 3):
                 self.game_over = True
 
+    def apply(self, action: int) -> None:
+        record = (self.current_player() == Player.CHANCE, tuple(self.pot), self.game_over, self.bets_key)
+        self.undo_stack().append(record)
+        self.act(action)
+
+    def undo(self) -> None:
+        was_chance, pot, game_over, self.bets_key = self.undo_stack().pop()
+        if was_chance:
+            self.cards.pop()
+        else:
+            self.bets.pop()
+        self.pot = list(pot)
+        self.game_over = game_over
+
     def total_state_transitions(self) -> int:
         return N_STATE_TRANSITIONS
 
@@ -107,7 +127,7 @@ class KuhnPoker(GameModel):
         return [Action.PASS, Action.BET]
 
     def copy_state(self) -> GameModel:
-        return copy.deepcopy(self)
+        return self.deepcopy_state()
 
     def information_set(self) -> str:
         if self.is_terminal() or (self.current_player() == Player.CHANCE):
@@ -118,6 +138,12 @@ class KuhnPoker(GameModel):
             visible_card = str(self.cards[player])
             return visible_card + "".join(["pb"[b] for b in self.bets])
 
+    def information_set_key(self) -> int:
+        if self.is_terminal() or (self.current_player() == Player.CHANCE):
+            return stable_hash("")
+        else:
+            return _CARD_KEYS[self.cards[self.current_player()]] ^ self.bets_key
+
     def __str__(self):
         if self.is_terminal():
             return f"{self.returns()[0]}"
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy
+
+mccfr_logger = logging.getLogger(__name__)
+
+c_handler = logging.StreamHandler()
+c_handler.setLevel(logging.DEBUG)
+
+mccfr_logger.addHandler(c_handler)
+
+
+class MCCFRSampling(IntEnum):
+    # sample chance and the opponent, enumerate the traverser's actions
+    EXTERNAL = 0
+    # sample a single history per traversal, exploring the traverser's actions with probability epsilon
+    OUTCOME = 1
+
+
+class MCCFRTables:
+    """
+    Cumulative regrets and strategy sums for MCCFR, one padded row per information set, indexed by action
+    as in FullCFR.calc_cfr. Rows are created on first visit.
+    """
+
+    def __init__(self) -> None:
+        self.regret_dict: Dict[Union[str, int], npt.NDArray] = dict()
+        self.strategy_dict: Dict[Union[str, int], npt.NDArray] = dict()
+
+    def regrets(self, key: Union[str, int], width: int) -> npt.NDArray:
+        row = self.regret_dict.get(key)
+        if row is None:
+            row = self.regret_dict[key] = np.zeros(width)
+            self.strategy_dict[key] = np.zeros(width)
+        return row
+
+    def strategy_sum(self, key: Union[str, int], width: int) -> npt.NDArray:
+        self.regrets(key, width)
+        return self.strategy_dict[key]
+
+
+class MCCFR(ABC):
+    """Common parts of the sampling solvers; they only use the GameModel interface, walking it with apply / undo"""
+
+    def __init__(self, state: GameModel, tables: MCCFRTables = None, int_keys: bool = False,
+                 seed: Optional[int] = None):
+        self.state = state
+        self.width = state.max_actions()
+        self.tables = tables if tables is not None else MCCFRTables()
+        self.int_keys = int_keys
+        self.labels: Dict[int, str] = dict()
+        self.rng = random.Random(seed)
+        # hardwire this for now
+        self.n_players = 2
+        self.n_iterations = 0
+
+    def key(self, state: GameModel) -> Union[str, int]:
+        if not self.int_keys:
+            return state.information_set()
+        key = state.information_set_key()
+        if key not in self.labels:
+            self.labels[key] = state.information_set()
+        return key
+
+    def slots(self, actions: List[int]) -> List[int]:
+        return [a % self.width for a in actions]
+
+    @staticmethod
+    def regret_matching(regrets: npt.NDArray) -> npt.NDArray:
+        """Current policy over the legal actions, given their cumulative regrets"""
+        positive = np.maximum(regrets, 0)
+        total = np.sum(positive)
+        if total > 0:
+            return positive / total
+        return np.full(len(regrets), 1 / len(regrets))
+
+    def sample_chance(self, state: GameModel) -> Tuple[int, float]:
+        actions, probs = zip(*state.chance_action_probs())
+        ix = self.rng.choices(range(len(actions)), probs)[0]
+        return actions[ix], probs[ix]
+
+    @abstractmethod
+    def traverse(self, traverser: int) -> float:
+        pass
+
+    def iteration(self) -> None:
+        """One iteration: a sampled traversal per player"""
+        for player in range(self.n_players):
+            self.traverse(player)
+        self.n_iterations += 1
+
+    def run(self, n_iterations: int) -> float:
+        """Runs n_iterations and returns the number of iterations per second"""
+        start = time.perf_counter()
+        for _ in range(n_iterations):
+            self.iteration()
+        elapsed = time.perf_counter() - start
+        return n_iterations / elapsed if elapsed > 0 else float("inf")
+
+    def to_policy(self) -> InfoSetTabularPolicy:
+        """
+        Copies the solve into an InfoSetTabularPolicy: the average policy (normalised strategy sums) goes into
+        policy_dict and the regret-matched current policy into p_action_dict
+        """
+        policy = InfoSetTabularPolicy(self.int_keys)
+        policy.labels.update(self.labels)
+        for key, regrets in self.tables.regret_dict.items():
+            strategy = self.tables.strategy_dict[key]
+            policy.regret_dict[key] = regrets.copy()
+            positive = np.maximum(regrets, 1e-16)
+            policy.p_action_dict[key] = positive / np.sum(positive)
+            total = np.sum(strategy)
+            policy.policy_dict[key] = strategy / total if total > 0 else np.full(self.width, 1 / self.width)
+        return policy
+
+
+class ExternalSamplingMCCFR(MCCFR):
+    """
+    External sampling MCCFR: for each traverser, chance and opponent actions are sampled and all of the traverser's
+    actions are explored, so the cost of an iteration grows with the traverser's branching only.
+    """
+
+    def traverse(self, traverser: int) -> float:
+        return self.walk(self.state, traverser)
+
+    def walk(self, state: GameModel, traverser: int) -> float:
+        if state.is_terminal():
+            return state.returns()[traverser]
+        player = state.current_player()
+        if player == Player.CHANCE:
+            action, _ = self.sample_chance(state)
+            state.apply(action)
+            value = self.walk(state, traverser)
+            state.undo()
+            return value
+
+        key = self.key(state)
+        actions = state.actions()
+        slots = self.slots(actions)
+        regrets = self.tables.regrets(key, self.width)
+        sigma = self.regret_matching(regrets[slots])
+        if player == traverser:
+            utility = np.zeros(len(actions))
+            for i, action in enumerate(actions):
+                state.apply(action)
+                utility[i] = self.walk(state, traverser)
+                state.undo()
+            value = float(np.dot(sigma, utility))
+            regrets[slots] += utility - value
+            return value
+        else:
+            # the opponent's average policy is accumulated where its actions are sampled
+            self.tables.strategy_sum(key, self.width)[slots] += sigma
+            ix = self.rng.choices(range(len(actions)), sigma)[0]
+            state.apply(actions[ix])
+            value = self.walk(state, traverser)
+            state.undo()
+            return value
+
+
+class OutcomeSamplingMCCFR(MCCFR):
+    """
+    Outcome sampling MCCFR: each traversal follows a single sampled history, with the traverser's actions sampled
+    from an epsilon-exploring version of its current policy, and the regrets are importance weighted.
+    """
+
+    def __init__(self, state: GameModel, tables: MCCFRTables = None, int_keys: bool = False,
+                 seed: Optional[int] = None, epsilon: float = 0.6):
+        super().__init__(state, tables, int_keys, seed)
+        self.epsilon = epsilon
+
+    def traverse(self, traverser: int) -> float:
+        utility, _ = self.walk(self.state, traverser, 1.0, 1.0, 1.0)
+        return utility
+
+    def walk(self, state: GameModel, traverser: int, own_reach: float, other_reach: float,
+             sample_prob: float) -> Tuple[float, float]:
+        """Returns the sampled utility, divided by the probability of sampling the history, and the tail reach"""
+        if state.is_terminal():
+            return state.returns()[traverser] / sample_prob, 1.0
+        player = state.current_player()
+        if player == Player.CHANCE:
+            action, prob = self.sample_chance(state)
+            state.apply(action)
+            result = self.walk(state, traverser, own_reach, other_reach * prob, sample_prob * prob)
+            state.undo()
+            return result
+
+        key = self.key(state)
+        actions = state.actions()
+        slots = self.slots(actions)
+        regrets = self.tables.regrets(key, self.width)
+        sigma = self.regret_matching(regrets[slots])
+        if player == traverser:
+            explore = self.epsilon / len(actions) + (1 - self.epsilon) * sigma
+        else:
+            explore = sigma
+        ix = self.rng.choices(range(len(actions)), explore)[0]
+        state.apply(actions[ix])
+        if player == traverser:
+            utility, tail = self.walk(state, traverser, own_reach * sigma[ix], other_reach,
+                                      sample_prob * explore[ix])
+        else:
+            utility, tail = self.walk(state, traverser, own_reach, other_reach * sigma[ix],
+                                      sample_prob * explore[ix])
+        state.undo()
+
+        if player == traverser:
+            w = utility * other_reach
+            sampled_regret = -w * tail * sigma[ix] * np.ones(len(actions))
+            sampled_regret[ix] = w * tail * (1 - sigma[ix])
+            regrets[slots] += sampled_regret
+        else:
+            self.tables.strategy_sum(key, self.width)[slots] += other_reach / sample_prob * sigma
+        return utility, tail * sigma[ix]
+
+
+def run_mccfr(state_factory, n_iterations: int = 1000, sampling: MCCFRSampling = MCCFRSampling.EXTERNAL,
+              int_keys: bool = False, seed: Optional[int] = None, report_every: int = 1000) -> InfoSetTabularPolicy:
+    solver_class = ExternalSamplingMCCFR if sampling == MCCFRSampling.EXTERNAL else OutcomeSamplingMCCFR
+    solver = solver_class(state_factory(), int_keys=int_keys, seed=seed)
+    done = 0
+    while done < n_iterations:
+        batch = min(report_every, n_iterations - done)
+        rate = solver.run(batch)
+        done += batch
+        print(f"{done=}, iterations per second={rate:.1f}, info sets={len(solver.tables.regret_dict)}")
+    return solver.to_policy()
+
+
+if __name__ == '__main__':
+    params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=6, max_turns=10)
+    run_mccfr(partial(MurderGameModel, params), 20000, MCCFRSampling.OUTCOME, int_keys=True)
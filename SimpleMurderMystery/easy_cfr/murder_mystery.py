@@ -1,12 +1,12 @@
 from dataclasses import dataclass
-from typing import List, NamedTuple, Set
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 from enum import IntEnum
 from functools import partial
 
 import random
-import copy
 
 from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.info_set_keys import zobrist_table, stable_hash
 
 N_STATE_TRANSITIONS: int = 0
 
@@ -45,6 +45,20 @@ class MurderGameState:
     moves: List[int]
 
 
+# Zobrist keys for the information sets, shared by all games with the same number of people and turns
+_ZOBRIST_TABLES: Dict[Tuple[int, int], Tuple[List[List[int]], List[int]]] = {}
+
+
+def murder_zobrist_tables(params: MurderMysteryParams) -> Tuple[List[List[int]], List[int]]:
+    """Returns a key per (move number, action), with pass in the last column, and a key per killer"""
+    shape = (params.n_people, params.max_turns)
+    if shape not in _ZOBRIST_TABLES:
+        move_keys = zobrist_table("murder-moves", params.max_turns, params.n_people + 1)
+        killer_keys = zobrist_table("murder-killer", 1, params.n_people)[0]
+        _ZOBRIST_TABLES[shape] = (move_keys, killer_keys)
+    return _ZOBRIST_TABLES[shape]
+
+
 class MurderGameModel(GameModel):
     def __init__(self, params: MurderMysteryParams = None):
         self.params = params or MurderMysteryParams()
@@ -52,6 +66,9 @@ class MurderGameModel(GameModel):
         killer = -1
         self.state = MurderGameState(alive=set(people), dead=set(), accused=set(), killer=killer, moves=[])
         self.pass_action = -1
+        # Zobrist hash of the moves that both players see, i.e. all except the chance move
+        self.public_key = 0
+        self.move_keys, self.killer_keys = murder_zobrist_tables(self.params)
 
     def move_no(self) -> int:
         return len(self.state.moves)
@@ -128,6 +145,7 @@ class MurderGameModel(GameModel):
         N_STATE_TRANSITIONS += 1
         if action == self.pass_action:
             assert self.params.allow_pass
+            self.update_public_key(action)
             self.state.moves.append(action)
             return
 
@@ -141,11 +159,35 @@ class MurderGameModel(GameModel):
             else:
                 assert self.current_player() == MurderMysteryPlayer.KILLER
                 self.kill_action(action)
+        self.update_public_key(action)
         self.state.moves.append(action)
 
+    def update_public_key(self, action: int) -> None:
+        move_no = self.move_no()
+        if move_no > 0:
+            self.public_key ^= self.move_keys[move_no][action % (self.params.n_people + 1)]
+
     def total_state_transitions(self) -> int:
         return N_STATE_TRANSITIONS
 
+    def apply(self, action: int) -> None:
+        # an action can only change the killer and whether the action's person is in alive, dead or accused
+        record = (self.state.killer, action in self.state.alive, action in self.state.dead,
+                  action in self.state.accused, self.public_key)
+        self.undo_stack().append(record)
+        self.act(action)
+
+    def undo(self) -> None:
+        killer, was_alive, was_dead, was_accused, self.public_key = self.undo_stack().pop()
+        action = self.state.moves.pop()
+        self.state.killer = killer
+        if was_alive:
+            self.state.alive.add(action)
+        if not was_dead:
+            self.state.dead.discard(action)
+        if not was_accused:
+            self.state.accused.discard(action)
+
     def score(self) -> float:
         if not self.is_terminal():
             return 0
@@ -166,7 +208,8 @@ class MurderGameModel(GameModel):
         return [score, -score]
 
     def copy_state(self) -> GameModel:
-        return copy.deepcopy(self)
+        # the Zobrist tables are shared by every game of this size, so the copy keeps referring to them
+        return self.deepcopy_state(shared=(self.move_keys, self.killer_keys))
 
     def information_set(self) -> str:
         if self.is_terminal():
@@ -183,6 +226,14 @@ class MurderGameModel(GameModel):
                 s+=f"k={self.state.killer}"
             return s
 
+    def information_set_key(self) -> int:
+        if self.is_terminal() or self.current_player() == Player.CHANCE:
+            return stable_hash(self.information_set())
+        elif self.current_player() == MurderMysteryPlayer.KILLER:
+            return self.public_key ^ self.killer_keys[self.state.killer]
+        else:
+            return self.public_key
+
     def current_player_string(self):
         lut = {-1: "C", 0: "K", 1: "D"}
         return lut[self.current_player()]
@@ -207,6 +258,183 @@ class MurderGameModel(GameModel):
         return "/" + "".join(["-"[m] for m in self.state.moves])
 
 
+# The bitset backend packs each set of people into an int, with bit i set when person i is a member
+@dataclass
+class MurderGameBitState:
+    alive: int
+    dead: int
+    accused: int
+    killer: int
+    moves: List[int]
+    # the player to move, or TERMINAL; act() keeps it up to date so it isn't re-derived on every query
+    player: int = Player.CHANCE
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def people_in(mask: int) -> List[int]:
+    return [i for i in range(mask.bit_length()) if mask >> i & 1]
+
+
+# legal action lists keyed on (candidates mask, excluded mask, pass action or None)
+_ACTION_LISTS: Dict[Tuple[int, int, Optional[int]], List[int]] = {}
+
+
+def bitset_action_list(candidates: int, excluded: int, pass_action: Optional[int]) -> List[int]:
+    """
+    Returns the legal actions for a bitset state in exactly the order that MurderGameModel.player_actions
+    produces them: that order comes from iterating over a Python set, so it is reproduced by building the
+    same set once per distinct mask and caching the resulting list.
+    """
+    key = (candidates, excluded, pass_action)
+    if key not in _ACTION_LISTS:
+        action_set = set(people_in(candidates))
+        action_set -= set(people_in(excluded))
+        if pass_action is not None:
+            action_set.add(pass_action)
+        _ACTION_LISTS[key] = list(action_set)
+    return _ACTION_LISTS[key]
+
+
+class BitsetMurderGameModel(MurderGameModel):
+    """
+    Drop-in replacement for MurderGameModel that stores alive, dead and accused as integer bitmasks.
+    Membership tests, scoring and legal-action generation become bit operations and popcounts instead of
+    set allocations, while returns() and information_set() are identical to the set-based model.
+    The player to move is stored with the state, so the tree walks' many is_terminal() and current_player()
+    calls are attribute reads.
+    """
+
+    def __init__(self, params: MurderMysteryParams = None):
+        self.params = params or MurderMysteryParams()
+        everyone = (1 << self.params.n_people) - 1
+        self.state = MurderGameBitState(alive=everyone, dead=0, accused=0, killer=-1, moves=[])
+        self.pass_action = -1
+        self.public_key = 0
+        self.move_keys, self.killer_keys = murder_zobrist_tables(self.params)
+        self.state.player = self.next_player()
+
+    def killer_bit(self) -> int:
+        # before the chance move the killer is -1, which is not a member of any set
+        return 0 if self.state.killer < 0 else 1 << self.state.killer
+
+    def next_player(self) -> int:
+        """Works out the player to move from the rest of the state, as MurderGameModel.current_player does"""
+        state = self.state
+        killer_bit = self.killer_bit()
+        n_moves = len(state.moves)
+        if n_moves >= self.params.max_turns or state.accused & killer_bit or not state.alive & ~killer_bit:
+            return Player.TERMINAL
+        elif n_moves == 0:
+            return Player.CHANCE
+        return 1 - n_moves % 2
+
+    def is_terminal(self) -> bool:
+        return self.state.player == Player.TERMINAL
+
+    def current_player(self) -> int:
+        return self.state.player
+
+    def is_chance_node(self) -> bool:
+        return self.state.player == Player.CHANCE
+
+    def chance_actions(self) -> List[int]:
+        assert self.current_player() == Player.CHANCE
+        return list(range(popcount(self.state.alive)))
+
+    def player_actions(self, player: int) -> List[int]:
+        assert player >= 0
+        excluded = 0
+        if self.state.player == MurderMysteryPlayer.KILLER and not self.params.allow_suicide:
+            excluded = self.killer_bit()
+        pass_action = self.pass_action if self.params.allow_pass else None
+        return list(bitset_action_list(self.state.alive, excluded, pass_action))
+
+    def kill_action(self, victim: int) -> None:
+        if not self.state.alive & self.killer_bit():
+            # the killer can't make a kill if they are already dead
+            return
+        assert self.current_player() == MurderMysteryPlayer.KILLER
+        if not self.params.allow_suicide:
+            assert not victim == self.state.killer, f"{victim}, {self.state.killer}, {self.move_no()}"
+        victim_bit = 1 << victim
+        self.state.alive &= ~victim_bit
+        self.state.dead |= victim_bit
+
+    def accuse_action(self, suspect: int) -> None:
+        assert self.current_player() == MurderMysteryPlayer.DETECTIVE
+        self.state.accused |= 1 << suspect
+
+    def act(self, action: int) -> None:
+        # as MurderGameModel.act, branching on the stored player
+        global N_STATE_TRANSITIONS
+        N_STATE_TRANSITIONS += 1
+        state = self.state
+        n_moves = len(state.moves)
+        if action == self.pass_action:
+            assert self.params.allow_pass
+        elif state.player == Player.CHANCE:
+            state.killer = action
+        elif state.player == MurderMysteryPlayer.DETECTIVE:
+            self.accuse_action(action)
+        else:
+            self.kill_action(action)
+        if n_moves > 0:
+            self.public_key ^= self.move_keys[n_moves][action % (self.params.n_people + 1)]
+        state.moves.append(action)
+        state.player = self.next_player()
+
+    def score(self) -> float:
+        if self.state.player != Player.TERMINAL:
+            return 0
+
+        killer_bit = self.killer_bit()
+        total = 0
+        if self.state.accused & killer_bit:
+            total += self.params.success_score
+        total -= self.params.cost_per_death * popcount(self.state.dead)
+        # there is no cost for accusing the killer
+        total -= self.params.cost_per_accusation * popcount(self.state.accused & ~killer_bit)
+        return total
+
+    def returns(self) -> List[float]:
+        # score() is zero for non-terminal states
+        score = self.score()
+        return [score, -score]
+
+    def apply(self, action: int) -> None:
+        state = self.state
+        self.undo_stack().append((state.alive, state.dead, state.accused, state.killer, state.player, self.public_key))
+        self.act(action)
+
+    def undo(self) -> None:
+        state = self.state
+        state.alive, state.dead, state.accused, state.killer, state.player, self.public_key = self.undo_stack().pop()
+        state.moves.pop()
+
+    def copy_state(self) -> GameModel:
+        # everything except the move list is immutable, so this is much cheaper than a deepcopy
+        cp = self.__class__.__new__(self.__class__)
+        cp.__dict__.update(self.state_dict())
+        cp.state = MurderGameBitState(alive=self.state.alive, dead=self.state.dead, accused=self.state.accused,
+                                      killer=self.state.killer, moves=list(self.state.moves),
+                                      player=self.state.player)
+        return cp
+
+
+MURDER_GAME_BACKENDS = {
+    "set": MurderGameModel,
+    "bitset": BitsetMurderGameModel,
+}
+
+
+def make_murder_game(params: MurderMysteryParams = None, backend: str = "set") -> MurderGameModel:
+    """Creates a murder game using the named state backend, e.g. partial(make_murder_game, params, backend="bitset")"""
+    return MURDER_GAME_BACKENDS[backend](params)
+
+
 if __name__ == '__main__':
     params = MurderMysteryParams(allow_pass=True)
     game = MurderGameModel()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import random
+from typing import List, Tuple
+
+from easy_cfr.game_and_agent_interfaces import GameModel, Player, PlayerInterface
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderMysteryPlayer, MurderGameModel, make_murder_game
+
+
+def canonical_people(moves: List[int], killer: int, n_people: int, pass_action: int,
+                     killer_view: bool) -> List[int]:
+    """
+    The real ids of the people in canonical label order, as seen by one player: the killer first when it is the
+    killer's view, then everyone else in order of first appearance in the public moves, then the people not yet
+    mentioned in id order. People are interchangeable apart from their ids, so two histories that are the same up
+    to relabelling get the same canonical form. Labels never change once given, so the relabelling is consistent
+    along every history.
+    """
+    order = [killer] if killer_view else []
+    # miss the first move, which is the chance move choosing the killer
+    for person in moves[1:]:
+        if person != pass_action and person not in order:
+            order.append(person)
+    order += [person for person in range(n_people) if person not in order]
+    return order
+
+
+class SymmetricMurderGameModel(GameModel):
+    """
+    A murder game presented with people relabelled canonically from the acting player's point of view,
+    so that information sets which differ only by who is who share one policy row. Actions at decision nodes are
+    canonical labels (the pass action is unchanged) and are mapped back to people before being played in the
+    underlying game, which can use any state backend. This cuts the number of information sets by up to
+    n_people! for the killer and by the number of ways to label the people already mentioned for the detective.
+    """
+
+    def __init__(self, params: MurderMysteryParams = None, backend: str = "set", game: MurderGameModel = None):
+        # pass game to wrap an existing state, e.g. to look up a symmetric policy while playing the real game
+        self.game = game if game is not None else make_murder_game(params, backend)
+        self.params = self.game.params
+        self.pass_action = self.game.pass_action
+
+    def people(self) -> List[int]:
+        """Real ids indexed by canonical label, for the current player"""
+        state = self.game.state
+        killer_view = self.game.current_player() == MurderMysteryPlayer.KILLER
+        return canonical_people(state.moves, state.killer, self.params.n_people, self.pass_action, killer_view)
+
+    def real_action(self, action: int) -> int:
+        if action == self.pass_action or self.game.current_player() == Player.CHANCE:
+            return action
+        return self.people()[action]
+
+    def canonical_actions(self, real_actions: List[int]) -> List[int]:
+        labels = {person: label for label, person in enumerate(self.people())}
+        canonical = sorted(labels[a] for a in real_actions if a != self.pass_action)
+        if self.pass_action in real_actions:
+            canonical.append(self.pass_action)
+        return canonical
+
+    def is_terminal(self) -> bool:
+        return self.game.is_terminal()
+
+    def current_player(self) -> int:
+        return self.game.current_player()
+
+    def n_actions(self) -> int:
+        return len(self.actions())
+
+    def max_actions(self) -> int:
+        return self.game.max_actions()
+
+    def actions(self) -> List[int]:
+        if self.current_player() == Player.CHANCE:
+            return self.game.actions()
+        return self.canonical_actions(self.game.actions())
+
+    def act(self, action: int) -> None:
+        self.game.act(self.real_action(action))
+
+    def apply(self, action: int) -> None:
+        self.game.apply(self.real_action(action))
+
+    def undo(self) -> None:
+        self.game.undo()
+
+    def returns(self) -> List[float]:
+        return self.game.returns()
+
+    def copy_state(self) -> GameModel:
+        return SymmetricMurderGameModel(game=self.game.copy_state())
+
+    def action_to_string(self, action) -> str:
+        return self.game.action_to_string(self.real_action(action))
+
+    def information_set(self) -> str:
+        if self.is_terminal() or self.current_player() == Player.CHANCE:
+            return self.game.information_set()
+        labels = {person: label for label, person in enumerate(self.people())}
+        labels[self.pass_action] = self.pass_action
+        s = str([labels[m] for m in self.game.state.moves[1:]])
+        if self.current_player() == MurderMysteryPlayer.KILLER:
+            # the killer always has the first label in their own view
+            s += "k=0"
+        return s
+
+
+class SymmetricPlayer(PlayerInterface):
+    """Plays the ordinary murder game with a player trained on SymmetricMurderGameModel"""
+
+    def __init__(self, player: PlayerInterface):
+        self.player = player
+
+    def get_action(self, state: GameModel) -> int:
+        return self.get_inf_set_action(state)
+
+    def get_inf_set_action(self, state: GameModel) -> int:
+        actions, probs = list(zip(*self.get_action_probs(state)))
+        return random.choices(actions, probs)[0]
+
+    def get_action_probs(self, state: MurderGameModel) -> List[Tuple[int, float]]:
+        view = SymmetricMurderGameModel(game=state)
+        return [(view.real_action(a), p) for a, p in self.player.get_action_probs(view)]
+
+
+if __name__ == '__main__':
+    from easy_cfr.policy_utils import get_info_sets
+
+    for n_people in range(3, 7):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=n_people, max_turns=7)
+        n_plain = len(get_info_sets(MurderGameModel(params), {}))
+        n_symmetric = len(get_info_sets(SymmetricMurderGameModel(params), {}))
+        print(f"{n_people=}, {n_plain=}, {n_symmetric=}, ratio={n_plain / n_symmetric:.1f}")
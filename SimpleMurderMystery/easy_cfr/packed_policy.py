@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy
+
+
+class RowView(Mapping):
+    """
+    Read-only dict-like view of one table of a PackedTabularPolicy, so code written against the
+    p_action_dict / regret_dict / policy_dict of InfoSetTabularPolicy keeps working.
+    The rows are views into the table, and become stale if the table grows.
+    """
+
+    def __init__(self, policy: PackedTabularPolicy, table_name: str):
+        self.policy = policy
+        self.table_name = table_name
+
+    def __getitem__(self, key: Union[str, int]) -> npt.NDArray:
+        return getattr(self.policy, self.table_name)[self.policy.index[key]]
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        return iter(self.policy.index)
+
+    def __len__(self) -> int:
+        return len(self.policy.index)
+
+
+class PackedTabularPolicy(InfoSetTabularPolicy):
+    """
+    InfoSetTabularPolicy with the regrets, current policy and average policy held in three contiguous 2D arrays,
+    addressed through a key -> row index and grown chunk_rows rows at a time.
+    update(step) is then a handful of whole-array operations instead of a loop over small per-key arrays.
+    """
+
+    def __init__(self, int_keys: bool = False, chunk_rows: int = 4096) -> None:
+        super().__init__(int_keys)
+        self.chunk_rows = chunk_rows
+        self.index: Dict[Union[str, int], int] = dict()
+        self.width: Optional[int] = None
+        self.n_rows = 0
+        self.regret_table = np.zeros((0, 0))
+        self.current_table = np.zeros((0, 0))
+        self.average_table = np.zeros((0, 0))
+        self.p_action_dict = RowView(self, "current_table")
+        self.regret_dict = RowView(self, "regret_table")
+        self.policy_dict = RowView(self, "average_table")
+
+    def grow(self) -> None:
+        capacity = len(self.regret_table) + self.chunk_rows
+        for name in ["regret_table", "current_table", "average_table"]:
+            old = getattr(self, name)
+            new = np.zeros((capacity, self.width))
+            if self.n_rows:
+                new[:self.n_rows] = old[:self.n_rows]
+            setattr(self, name, new)
+
+    def add_row(self, key: Union[str, int], n_actions: int) -> int:
+        if self.width is None:
+            self.width = n_actions
+        assert n_actions == self.width, f"{n_actions=} but rows have width {self.width}"
+        if self.n_rows == len(self.regret_table):
+            self.grow()
+        row = self.n_rows
+        self.n_rows += 1
+        self.index[key] = row
+        self.current_table[row] = 1 / n_actions
+        self.average_table[row] = 1 / n_actions
+        return row
+
+    def row(self, key: Union[str, int], n_actions: int) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = self.add_row(key, n_actions)
+        return row
+
+    def p_actions(self, key: Union[str, int], n_actions: int) -> npt.NDArray:
+        row = self.row(key, n_actions)
+        assert self.width == n_actions
+        return self.current_table[row]
+
+    def regrets(self, key: Union[str, int]) -> npt.NDArray:
+        assert key in self.index
+        return self.regret_table[self.index[key]]
+
+    def force_random(self):
+        self.average_table[:self.n_rows] = 1 / self.width
+
+    def regret_match(self) -> None:
+        n = self.n_rows
+        current = self.current_table[:n]
+        np.maximum(self.regret_table[:n], 1e-16, out=current)
+        current /= np.sum(current, axis=1, keepdims=True)
+
+    def average(self, lr: float) -> None:
+        n = self.n_rows
+        average = self.average_table[:n]
+        average *= (1 - lr)
+        average += self.current_table[:n] * lr
+
+    def clamp_regrets(self) -> None:
+        np.maximum(self.regret_table[:self.n_rows], 0, out=self.regret_table[:self.n_rows])
+
+    def discount_regrets(self, positive_factor: float, negative_factor: float) -> None:
+        regrets = self.regret_table[:self.n_rows]
+        regrets *= np.where(regrets > 0, positive_factor, negative_factor)
+
+    def scale_regrets(self, factor: float) -> None:
+        self.regret_table[:self.n_rows] *= factor
+
+    def update(self, step: int) -> None:
+        self.regret_match()
+        self.average(1 / (1 + step))
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.simpler_cfr import FullCFR, InfoSetTabularPolicy
+from easy_cfr.tree_walk import iter_tree
+
+parallel_logger = logging.getLogger(__name__)
+
+c_handler = logging.StreamHandler()
+c_handler.setLevel(logging.DEBUG)
+
+parallel_logger.addHandler(c_handler)
+
+# the chance actions leading from the root to a subtree, and their probability
+SubtreeRoot = Tuple[Tuple[int, ...], float]
+
+
+def chance_frontier(state: GameModel) -> List[SubtreeRoot]:
+    """
+    Expands the chance nodes at the top of the tree, e.g. the choice of killer in the murder game or the deal
+    in Kuhn poker, and returns the first non-chance nodes below them; state is left unchanged
+    """
+    if state.current_player() != Player.CHANCE:
+        return [((), 1.0)]
+    frontier = []
+    for action, prob in state.chance_action_probs():
+        state.apply(action)
+        for prefix, sub_prob in chance_frontier(state):
+            frontier.append(((action,) + prefix, prob * sub_prob))
+        state.undo()
+    return frontier
+
+
+def subtree_keys(state: GameModel, prefix: Tuple[int, ...], policy: InfoSetTabularPolicy) -> List[Union[str, int]]:
+    """The policy keys of the information sets in the subtree below prefix; state is left unchanged"""
+    for action in prefix:
+        state.apply(action)
+    keys = dict.fromkeys(policy.key(node) for node, _ in iter_tree(state)
+                         if not node.is_terminal() and node.current_player() != Player.CHANCE)
+    for _ in prefix:
+        state.undo()
+    return list(keys)
+
+
+class RegretDeltaPolicy(InfoSetTabularPolicy):
+    """
+    A worker's view of the policy: a snapshot of the current policy rows for its subtree, with regrets that start
+    at zero, so that after a pass over the subtree the regret table holds just that subtree's contribution
+    """
+
+    def __init__(self, int_keys: bool, p_action_dict: Dict[Union[str, int], npt.NDArray]) -> None:
+        super().__init__(int_keys)
+        self.p_action_dict = p_action_dict
+
+    def regrets(self, key: Union[str, int]) -> npt.NDArray:
+        if key not in self.regret_dict:
+            self.regret_dict[key] = np.zeros(len(self.p_action_dict[key]))
+        return self.regret_dict[key]
+
+
+_worker_state_factory = None
+
+
+def _init_worker(state_factory) -> None:
+    global _worker_state_factory
+    _worker_state_factory = state_factory
+
+
+def _subtree_cfr(prefix: Tuple[int, ...], prob: float, int_keys: bool,
+                 p_action_dict: Dict[Union[str, int], npt.NDArray]) -> Tuple[npt.NDArray, RegretDeltaPolicy]:
+    """Runs in a worker: one CFR pass over the subtree below prefix"""
+    state = _worker_state_factory()
+    for action in prefix:
+        state.apply(action)
+    policy = RegretDeltaPolicy(int_keys, p_action_dict)
+    full_cfr = FullCFR(state, policy)
+    reach = np.ones(full_cfr.n_players + 1)
+    reach[Player.CHANCE] = prob
+    values = full_cfr.calc_cfr(state, reach)
+    # only send back the rows the pass created or changed
+    policy.p_action_dict = {key: p_action_dict[key] for key in policy.regret_dict}
+    policy.policy_dict = dict()
+    return values, policy
+
+
+class ParallelCFR:
+    """
+    Vanilla CFR with each iteration split over the subtrees below the root chance nodes, which are walked in a
+    pool of worker processes. Each worker gets a snapshot of the current policy rows its subtree uses, found once
+    when the frontier is built, and returns the regret deltas for its subtree; these are summed into the policy
+    before update(step), so the result matches FullCFR up to floating point rounding.
+    """
+
+    def __init__(self, state_factory, policy: InfoSetTabularPolicy, executor: ProcessPoolExecutor):
+        self.policy = policy
+        self.executor = executor
+        state = state_factory()
+        self.frontier = chance_frontier(state)
+        self.subtree_keys = [subtree_keys(state, prefix, policy) for prefix, _ in self.frontier]
+
+    def merge(self, delta: RegretDeltaPolicy) -> None:
+        self.policy.labels.update(delta.labels)
+        for key, regrets in delta.regret_dict.items():
+            self.policy.p_actions(key, len(regrets))
+            self.policy.regrets(key)[:] += regrets
+
+    def iteration(self, step: int) -> npt.NDArray:
+        p_action_dict = self.policy.p_action_dict
+        futures = []
+        for (prefix, prob), keys in zip(self.frontier, self.subtree_keys):
+            # rows that don't exist yet are created uniform by the worker, on the first iteration
+            rows = {key: p_action_dict[key] for key in keys if key in p_action_dict}
+            futures.append(self.executor.submit(_subtree_cfr, prefix, prob, self.policy.int_keys, rows))
+        values = 0
+        for (prefix, prob), future in zip(self.frontier, futures):
+            subtree_values, delta = future.result()
+            values += prob * subtree_values
+            self.merge(delta)
+        self.policy.update(step)
+        return values
+
+
+def run_parallel_cfr(state_factory, n_iterations: int = 100, int_keys: bool = False,
+                     policy: Optional[InfoSetTabularPolicy] = None,
+                     max_workers: Optional[int] = None) -> InfoSetTabularPolicy:
+    # state_factory is sent to the workers once, so it must pickle, e.g. partial(MurderGameModel, params)
+    policy = policy if policy is not None else InfoSetTabularPolicy(int_keys)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(state_factory,)) as executor:
+        parallel_cfr = ParallelCFR(state_factory, policy, executor)
+        parallel_logger.info(f"{len(parallel_cfr.frontier)} subtrees")
+        for step in range(n_iterations):
+            values = parallel_cfr.iteration(step)
+            print(f"{step=}, {values=}")
+    return policy
+
+
+if __name__ == '__main__':
+    params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=5, max_turns=8)
+    run_parallel_cfr(partial(MurderGameModel, params), 10, int_keys=True)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+from typing import List, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.checkpoint import policy_tables
+from easy_cfr.game_and_agent_interfaces import GameModel, PlayerInterface
+from easy_cfr.info_set_keys import stable_hash
+
+# A solved policy on disk, as a directory of three files:
+#   index.npy - the 64 bit key of each information set, sorted
+#   probs.npy - float32 average policy rows, in the same order, indexed by action as in policy_dict
+#   meta.json - whether the keys are GameModel.information_set_key() values or hashes of the strings
+# The two arrays are opened with mmap_mode="r", so a lookup only touches the pages it needs, and processes
+# that open the same store share one page-cached copy.
+INDEX_FILE = "index.npy"
+PROBS_FILE = "probs.npy"
+META_FILE = "meta.json"
+
+
+def store_key(key: Union[str, int]) -> int:
+    """Integer keys are stored as they are, strings by their stable_hash"""
+    return key if isinstance(key, int) else stable_hash(key)
+
+
+def export_policy_store(path: str, policy) -> int:
+    """Writes the average policy of a MyPolicy or an InfoSetTabularPolicy to a store; returns the number of rows"""
+    keys, _, _, average = policy_tables(policy)
+    hashes = np.array([store_key(key) for key in keys], dtype=np.uint64)
+    order = np.argsort(hashes, kind="stable")
+    hashes = hashes[order]
+    if len(hashes) > 1 and np.any(hashes[1:] == hashes[:-1]):
+        raise ValueError("information set keys collide in the store index")
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, INDEX_FILE), hashes)
+    np.save(os.path.join(path, PROBS_FILE), np.asarray(average, dtype=np.float32)[order])
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump({"int_keys": getattr(policy, "int_keys", False)}, f)
+    return len(hashes)
+
+
+class PolicyStore:
+    """Read-only, memory mapped view of a store written by export_policy_store"""
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, META_FILE)) as f:
+            self.int_keys: bool = json.load(f)["int_keys"]
+        self.index: npt.NDArray = np.load(os.path.join(path, INDEX_FILE), mmap_mode="r")
+        self.probs: npt.NDArray = np.load(os.path.join(path, PROBS_FILE), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def width(self) -> int:
+        return self.probs.shape[1]
+
+    def state_key(self, state: GameModel) -> int:
+        return state.information_set_key() if self.int_keys else stable_hash(state.information_set())
+
+    def row(self, key: Union[str, int]) -> npt.NDArray:
+        """The policy row of an information set key (or information set string); raises KeyError if absent"""
+        h = np.uint64(store_key(key))
+        ix = int(np.searchsorted(self.index, h))
+        if ix == len(self.index) or self.index[ix] != h:
+            raise KeyError(key)
+        return self.probs[ix]
+
+    def action_probs(self, state: GameModel) -> List[Tuple[int, float]]:
+        probs = self.row(self.state_key(state))
+        return [(a, float(probs[a % self.width])) for a in state.actions()]
+
+
+class PolicyStorePlayer(PlayerInterface):
+    """Plays from a PolicyStore, with the same methods as PolicyPlayer"""
+
+    def __init__(self, store: PolicyStore):
+        self.store = store
+
+    def get_action(self, state: GameModel) -> int:
+        return self.get_inf_set_action(state)
+
+    def get_inf_set_action(self, state: GameModel) -> int:
+        actions, probs = list(zip(*self.get_action_probs(state)))
+        return random.choices(actions, probs)[0]
+
+    def get_action_probs(self, state: GameModel) -> List[Tuple[int, float]]:
+        return self.store.action_probs(state)
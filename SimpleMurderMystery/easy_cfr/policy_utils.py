@@ -1,10 +1,12 @@
 import logging
-from typing import Dict
+from typing import Dict, Optional
 import numpy as np
 
 from easy_cfr.cfr import FullCFR
+from easy_cfr.checkpoint import Checkpointer, load_checkpoint, restore_my_policy
 from easy_cfr.game_and_agent_interfaces import GameModel
 from easy_cfr.policy_player import MyPolicy, PolicyPlayer
+from easy_cfr.tree_walk import iter_tree
 
 policy_logger = logging.getLogger(__name__)
 
@@ -14,51 +16,57 @@ c_handler.setLevel(logging.DEBUG)
 policy_logger.addHandler(c_handler)
 
 def get_info_sets(state: GameModel, info_set_index: Dict[str, int]) -> Dict[str, int]:
-    ix = len(info_set_index.items())
-    key = state.information_set()
-    policy_logger.info(f"{key=}")
-    if not key in info_set_index.keys() and not (key == ''):
-        info_set_index[key] = ix
-
-    for child in state.children():
-        get_info_sets(child, info_set_index)
+    for node, _ in iter_tree(state):
+        key = node.information_set()
+        policy_logger.info("key=%r", key)
+        if not key in info_set_index.keys() and not (key == ''):
+            info_set_index[key] = len(info_set_index)
     return info_set_index
 
 
 def get_info_sets_per_player(state: GameModel, info_set_index: Dict[str, int], player_id: int) -> Dict[str, int]:
-    ix = len(info_set_index.items())
-    key = state.information_set()
-    if not key in info_set_index.keys() and not (key == '') and state.current_player() == player_id:
-        info_set_index[key] = ix
-
-    for child in state.children():
-        get_info_sets_per_player(child, info_set_index, player_id)
+    for node, _ in iter_tree(state):
+        key = node.information_set()
+        if not key in info_set_index.keys() and not (key == '') and node.current_player() == player_id:
+            info_set_index[key] = len(info_set_index)
     return info_set_index
 
 class PolicyHelper:
     def get_policy(self, state: GameModel, n_players: int = 2) -> MyPolicy:
         info_sets = get_info_sets(state, {})
-        my_policy = MyPolicy(info_sets, n_players, n_actions=5)
+        my_policy = MyPolicy(info_sets, n_players, n_actions=state.max_actions())
         # my_policy.print()
         return my_policy
 
 
 
-def run_cfr(state_factory, n_iterations: int = 100) -> MyPolicy:
-    policy = PolicyHelper().get_policy(state_factory())
+def run_cfr(state_factory, n_iterations: int = 100, policy: Optional[MyPolicy] = None, start_step: int = 0,
+            checkpoint_path: Optional[str] = None, checkpoint_interval: float = 10.0) -> MyPolicy:
+    policy = policy if policy is not None else PolicyHelper().get_policy(state_factory())
     initial_state = state_factory()
     full_cfr = FullCFR(initial_state, policy)
+    checkpointer = Checkpointer(checkpoint_path, checkpoint_interval)
 
-    for step in range(n_iterations):
+    for step in range(start_step, n_iterations):
         policy_logger.info(f"{step=}")
         values = full_cfr.calc_cfr(initial_state, np.ones(1 + policy.n_players))
         policy.update(step)
         # policy.print()
         # print(f"{step=}, {values=}")
         # print()
+        checkpointer.maybe_save(policy, step + 1, force=step == n_iterations - 1)
 
     return policy
 
+
+def resume_cfr(state_factory, checkpoint_path: str, n_iterations: int = 100,
+               checkpoint_interval: float = 10.0) -> MyPolicy:
+    """Continues a run_cfr solve from its checkpoint, up to n_iterations in total"""
+    checkpoint = load_checkpoint(checkpoint_path)
+    return run_cfr(state_factory, n_iterations, policy=restore_my_policy(checkpoint),
+                   start_step=checkpoint.next_step, checkpoint_path=checkpoint_path,
+                   checkpoint_interval=checkpoint_interval)
+
 def get_policy_player(state_factory, n_iterations: int = 5) -> PolicyPlayer:
     policy = run_cfr(state_factory, n_iterations)
     policy_player = PolicyPlayer(policy.info_sets, policy.policy)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_and_agent_interfaces import GameModel, PlayerInterface
+from easy_cfr.game_tree_arena import GameTreeArena
+
+
+class SegmentedTabularPolicy:
+    """
+    Tabular policy in a CSR layout: only the legal actions of each information set are stored, as one flat
+    array of actions with row offsets, so late-game information sets with few people left alive don't pay
+    for max_actions() columns. Regret matching and averaging work over the segments of the flat arrays.
+    The rows are fixed when the policy is created, normally from a compiled arena.
+    """
+
+    def __init__(self, keys: List[Union[str, int]], offsets: npt.NDArray, actions: npt.NDArray,
+                 labels: List[str] = None) -> None:
+        self.keys = keys
+        self.index: Dict[Union[str, int], int] = {key: row for row, key in enumerate(keys)}
+        # display strings when the keys are integer information set keys
+        self.labels = labels
+        self.offsets = offsets
+        self.actions = actions
+        self.lengths = np.diff(offsets)
+        uniform = np.repeat(1 / self.lengths, self.lengths)
+        self.regrets = np.zeros(len(actions))
+        self.current = uniform.copy()
+        self.average = uniform.copy()
+
+    @classmethod
+    def from_arena(cls, arena: GameTreeArena, int_keys: bool = False) -> SegmentedTabularPolicy:
+        keys = arena.info_set_ids if int_keys else arena.info_set_keys
+        labels = arena.info_set_keys if int_keys else None
+        return cls(list(keys), arena.action_offsets, arena.info_set_actions, labels)
+
+    @property
+    def int_keys(self) -> bool:
+        return self.labels is not None
+
+    def key(self, state: GameModel) -> Union[str, int]:
+        return state.information_set_key() if self.int_keys else state.information_set()
+
+    def segment(self, key: Union[str, int]) -> slice:
+        row = self.index[key]
+        return slice(self.offsets[row], self.offsets[row + 1])
+
+    def entry_index(self, rows: npt.NDArray, actions: npt.NDArray, width: int) -> npt.NDArray:
+        """Flat index of each (row, action) pair, found by searching the entries in padded-column order"""
+        row_of_entry = np.repeat(np.arange(len(self.lengths)), self.lengths)
+        sorted_keys = row_of_entry * width + self.actions % width
+        wanted = rows * width + actions % width
+        index = np.searchsorted(sorted_keys, wanted)
+        assert np.all(sorted_keys[index] == wanted)
+        return index
+
+    def segment_sums(self, values: npt.NDArray) -> npt.NDArray:
+        return np.add.reduceat(values, self.offsets[:-1])
+
+    def update(self, step: int) -> None:
+        floored_regrets = np.maximum(self.regrets, 1e-16)
+        self.current = floored_regrets / np.repeat(self.segment_sums(floored_regrets), self.lengths)
+        lr = 1 / (1 + step)
+        self.average *= (1 - lr)
+        self.average += self.current * lr
+
+    def force_random(self) -> None:
+        self.average = np.repeat(1 / self.lengths, self.lengths)
+
+    def action_probs(self, key: Union[str, int], actions: List[int]) -> List[Tuple[int, float]]:
+        """Average policy probabilities for the given legal actions"""
+        seg = self.segment(key)
+        probs = dict(zip(self.actions[seg].tolist(), self.average[seg]))
+        return [(a, probs[a]) for a in actions]
+
+    def padded_row(self, key: Union[str, int], width: int) -> npt.NDArray:
+        """The average policy as a padded row indexed by action, as in InfoSetTabularPolicy.policy_dict"""
+        seg = self.segment(key)
+        row = np.zeros(width)
+        row[self.actions[seg] % width] = self.average[seg]
+        return row
+
+    def nbytes(self) -> int:
+        return self.regrets.nbytes + self.current.nbytes + self.average.nbytes + self.actions.nbytes + \
+               self.offsets.nbytes
+
+
+class SegmentedPolicyPlayer(PlayerInterface):
+    def __init__(self, policy: SegmentedTabularPolicy):
+        self.policy = policy
+
+    def get_action(self, state: GameModel) -> int:
+        return self.get_inf_set_action(state)
+
+    def get_inf_set_action(self, state: GameModel) -> int:
+        actions, probs = list(zip(*self.get_action_probs(state)))
+        return random.choices(actions, probs)[0]
+
+    def get_action_probs(self, state: GameModel) -> List[Tuple[int, float]]:
+        return self.policy.action_probs(self.policy.key(state), state.actions())
@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 import logging
+import math
 import random
+import time
+from enum import IntEnum
 from functools import partial
-from typing import List, Optional, Dict, Tuple
+from typing import Callable, List, NamedTuple, Optional, Dict, Tuple, Union
 
 import numpy as np
 import numpy.typing as npt
 
+from easy_cfr.checkpoint import Checkpointer, load_checkpoint, restore_tabular_policy
 from easy_cfr.evaluate_policies import print_eval
 from easy_cfr.game_and_agent_interfaces import GameModel, Player, PlayerInterface
 from easy_cfr.kuhn_poker import KuhnPoker
 from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
 from easy_cfr.policy_player import MyPolicy
+from easy_cfr.tree_walk import walk_tree
 
 np.set_printoptions(precision=3, suppress=True, floatmode='fixed')
 
@@ -27,10 +32,25 @@ info_set_logger.addHandler(c_handler)
 
 
 class InfoSetTabularPolicy:
-    def __init__(self) -> None:
-        self.p_action_dict: Dict[str, npt.NDArray] = dict()
-        self.regret_dict: Dict[str, npt.NDArray] = dict()
-        self.policy_dict: Dict[str, npt.NDArray] = dict()
+    def __init__(self, int_keys: bool = False) -> None:
+        # with int_keys the tables are keyed by state.information_set_key() rather than the information set
+        # string, which is then only built once per information set, for display
+        self.int_keys = int_keys
+        self.labels: Dict[int, str] = dict()
+        self.p_action_dict: Dict[Union[str, int], npt.NDArray] = dict()
+        self.regret_dict: Dict[Union[str, int], npt.NDArray] = dict()
+        self.policy_dict: Dict[Union[str, int], npt.NDArray] = dict()
+
+    def key(self, state: GameModel) -> Union[str, int]:
+        if not self.int_keys:
+            return state.information_set()
+        key = state.information_set_key()
+        if key not in self.labels:
+            self.labels[key] = state.information_set()
+        return key
+
+    def key_label(self, key: Union[str, int]) -> str:
+        return self.labels[key] if self.int_keys else key
 
     def p_actions(self, key: str, n_actions: int) -> npt.NDArray:
         if key in self.p_action_dict:
@@ -59,18 +79,37 @@ class InfoSetTabularPolicy:
             n = len(value)
             self.policy_dict[key] = np.ones(n) / n
 
-    def update(self, step: int) -> None:
+    def regret_match(self) -> None:
+        """Sets the current policy in proportion to the positive regrets"""
         for key, regrets in self.regret_dict.items():
             floored_regrets = np.maximum(regrets, 1e-16)
             self.p_action_dict[key] = self.normalise(floored_regrets)
-            lr = 1 / (1 + step)
-            # todo: need to ensure this works properly
-            self.policy_dict[key] *= (1 - lr)
-            self.policy_dict[key] += self.p_action_dict[key] * lr
-            # print(f"updating for {key=}")
-            # print(f"updated: {floored_regrets=}")
-            # print(f"updated: {self.policy_dict[key]=}")
-            # print(f"updated: {self.p_action_dict[key]=}")
+
+    def average(self, lr: float) -> None:
+        """Moves the average policy towards the current policy by lr"""
+        for key, average in self.policy_dict.items():
+            average *= (1 - lr)
+            average += self.p_action_dict[key] * lr
+
+    def clamp_regrets(self) -> None:
+        """Floors the cumulative regrets at zero, as in regret-matching+"""
+        for regrets in self.regret_dict.values():
+            np.maximum(regrets, 0, out=regrets)
+
+    def discount_regrets(self, positive_factor: float, negative_factor: float) -> None:
+        """Scales the positive and negative cumulative regrets by separate factors, as in discounted CFR"""
+        for regrets in self.regret_dict.values():
+            regrets *= np.where(regrets > 0, positive_factor, negative_factor)
+
+    def scale_regrets(self, factor: float) -> None:
+        """Multiplies all the cumulative regrets by factor"""
+        for regrets in self.regret_dict.values():
+            regrets *= factor
+
+    def update(self, step: int) -> None:
+        self.regret_match()
+        # todo: need to ensure this works properly
+        self.average(1 / (1 + step))
 
 
 class TabularPolicyPlayer(PlayerInterface):
@@ -85,25 +124,72 @@ class TabularPolicyPlayer(PlayerInterface):
         return self.get_inf_set_action(state)
 
     def get_inf_set_action(self, state: GameModel) -> int:
-        inf_set = state.information_set()
         action_probs = self.get_action_probs(state)
         actions, probs = list(zip(*action_probs))
         choice = random.choices(actions, probs)[0]
         return choice
 
     def get_action_probs(self, state: GameModel) -> List[Tuple[int, float]]:
-        inf_set = state.information_set()
+        inf_set = self.policy.key(state)
         probs = self.policy.policy_dict[inf_set]
         ap = [(a, p) for a, p in zip(state.actions(), probs)]
         return ap
 
 
+class CFRVariant(IntEnum):
+    # simultaneous updates, current policies averaged with equal weight
+    VANILLA = 0
+    # regret-matching+ (cumulative regrets floored at zero), alternating updates and linear averaging
+    CFR_PLUS = 1
+    # discounted CFR, with the discounting set by DCFRParams
+    DCFR = 2
+
+
+class DCFRParams(NamedTuple):
+    # on iteration t, positive regrets are scaled by t^alpha / (t^alpha + 1), negative ones by t^beta / (t^beta + 1)
+    alpha: float = 1.5
+    beta: float = 0.0
+    # and the earlier contributions to the average policy are scaled by (t / (t + 1))^gamma
+    gamma: float = 2.0
+
+
+class PruningParams(NamedTuple):
+    # partial pruning: a subtree is skipped when, for every player whose regrets are being updated, the reach of
+    # the other players (and chance) there is at most reach_threshold, so those regrets (almost) can't change.
+    # 0 would be exact, but regret matching keeps every action probability above zero, so it takes a small
+    # positive threshold to prune. None turns partial pruning off.
+    reach_threshold: Optional[float] = 1e-9
+    # regret-based pruning: at a node with some positive regret, actions with cumulative regret below
+    # regret_threshold (a negative number) have a negligible current probability and are skipped, leaving their
+    # regrets unchanged. CFR+ floors regrets at zero, so this has no effect there. None turns it off.
+    regret_threshold: Optional[float] = None
+    # every revisit_every iterations, starting with the first, nothing is pruned, so that every row exists and
+    # pruned actions can recover
+    revisit_every: int = 10
+
+
+class ChanceSampling(NamedTuple):
+    # at each chance node, n_samples outcomes are sampled uniformly without replacement and each is weighted by
+    # p * m / n_samples, for m outcomes, which keeps the values and regret updates unbiased
+    n_samples: int = 1
+    seed: Optional[int] = None
+
+
 class FullCFR:
     def __init__(self, game: GameModel, policy: InfoSetTabularPolicy):
         self.game = game
         self.policy = policy
         # hardwire this for now
         self.n_players = 2
+        # when set, only this player's regrets are updated, for alternating updates
+        self.update_player: Optional[int] = None
+        # set for the iterations that prune
+        self.pruning: Optional[PruningParams] = None
+        # the number of nodes visited, to measure the pruning
+        self.n_visited = 0
+        # set for the iterations that sample chance outcomes
+        self.chance_sampling: Optional[ChanceSampling] = None
+        self.rng = random.Random()
 
     def new_reach(self, so_far: npt.NDArray, player: int, action_prob: float) -> npt.NDArray:
         """Returns new reach probabilities."""
@@ -113,68 +199,244 @@ class FullCFR:
 
     def calc_cfr(self, state: GameModel, reach: npt.NDArray) -> npt.NDArray:
         """Updates regrets; returns utility for all players."""
+        # the state is walked in place by walk_tree, with the reach vector passed down to each child
+        return walk_tree(state, self.enter, self.leave, reach)
+
+    def others_reach(self, reach: npt.NDArray, player: int) -> float:
+        """The probability that everyone but player (including chance) played to reach a node"""
+        return np.prod(reach[:player]) * np.prod(reach[player + 1:])
+
+    def unreachable(self, reach: npt.NDArray) -> bool:
+        """True if none of the regrets being updated can change below a node with this reach"""
+        players = range(self.n_players) if self.update_player is None else [self.update_player]
+        # on floats, as this is checked for every edge
+        r = reach.tolist()
+        return all(math.prod(r[:player]) * math.prod(r[player + 1:]) <= self.pruning.reach_threshold
+                   for player in players)
+
+    def prune(self, edges: List[Tuple[int, npt.NDArray]], regrets: Optional[npt.NDArray] = None):
+        """Drops the edges that partial or regret-based pruning skips"""
+        if regrets is not None and self.pruning.regret_threshold is not None and np.max(regrets) > 0:
+            edges = [(action, reach) for action, reach in edges if regrets[action] >= self.pruning.regret_threshold]
+        if self.pruning.reach_threshold is not None:
+            edges = [(action, reach) for action, reach in edges if not self.unreachable(reach)]
+        return edges
+
+    def sample_chance(self, action_probs: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """A sample of the chance outcomes, with their probabilities scaled up by the importance weights"""
+        m = len(action_probs)
+        k = min(self.chance_sampling.n_samples, m)
+        if k == m:
+            return action_probs
+        return [(action, prob * m / k) for action, prob in self.rng.sample(action_probs, k)]
+
+    def enter(self, state: GameModel, reach: npt.NDArray):
+        """Sets up a node on the way down: returns its context and the reach of each child."""
+        self.n_visited += 1
         if state.is_terminal():
-            return state.returns()
+            return None, ()
         elif state.current_player() == Player.CHANCE:
             # print(state.chance_action_probs())
-            return sum(prob * self.calc_cfr(state.child(action), self.new_reach(reach, Player.CHANCE, prob))
-                       for action, prob in state.chance_action_probs())
-        else:
-            # We are at a player decision point.
-            player = state.current_player()
-            inf_set = state.information_set()
-            max_actions = state.max_actions()
-
-            # Compute utilities after each action, updating regrets deeper in the tree.
-            utility = np.zeros((max_actions, self.n_players))
-            # iterate over all the actions, setting the utility for each one
-            action_probs = self.policy.p_actions(inf_set, max_actions)
-            regrets = self.policy.regrets(inf_set)
-
-            for action in state.actions():
-                info_set_logger.info(action_probs)
-                prob = action_probs[action]
-
-                # utility is the vector of utilities for each player, given this action
-                utility[action] = self.calc_cfr(state.child(action), self.new_reach(reach, player, prob))
-
-            # Compute regrets at this state.
-            # the reach vector is the probability that each player played to get here
-            # but for the current state we exclude the current player, who is assumed to have played that move intentionally with p=1
-            cfr_prob = np.prod(reach[:player]) * np.prod(reach[player + 1:])
-
-            # the value is a vector with the value for each player calculated by mutiplying the utility by the probability of selecting the action
-            # value = [u * p for player in range()]
-            policy_vec = action_probs
-            value = [sum(utility[action][player] * policy_vec[action] for action in state.actions()) for player in
-                     range(self.n_players)]
-            value = np.array(value)
-            info_set_logger.info(f"{value=}")
-            for action in state.actions():
-                regrets[action] += cfr_prob * (utility[action][player] - value[player])
-
-            # Return the value of this state for all players.
+            action_probs = state.chance_action_probs()
+            if self.chance_sampling is not None:
+                action_probs = self.sample_chance(action_probs)
+            edges = [(action, self.new_reach(reach, Player.CHANCE, prob)) for action, prob in action_probs]
+            probs = [prob for _, prob in action_probs]
+            if self.pruning is not None:
+                edges = self.prune(edges)
+                # a pruned outcome adds nothing to the value
+                visited = set(action for action, _ in edges)
+                probs = [prob for action, prob in action_probs if action in visited]
+            return (Player.CHANCE, None, None, probs, reach), edges
+        # We are at a player decision point.
+        player = state.current_player()
+        inf_set = self.policy.key(state)
+        max_actions = state.max_actions()
+        actions = state.actions()
+        # the probability of each action under the current policy
+        action_probs = self.policy.p_actions(inf_set, max_actions)
+        edges = []
+        for action in actions:
+            info_set_logger.info(action_probs)
+            prob = action_probs[action]
+            edges.append((action, self.new_reach(reach, player, prob)))
+        if self.pruning is not None:
+            edges = self.prune(edges, self.policy.regrets(inf_set))
+        return (player, inf_set, edges, action_probs, reach), edges
+
+    def leave(self, state: GameModel, context, child_values: List[npt.NDArray]) -> npt.NDArray:
+        """Updates the regrets at a node on the way back up; returns its utility for all players."""
+        if context is None:
+            return state.returns()
+        player, inf_set, edges, action_probs, reach = context
+        if player == Player.CHANCE:
+            value = 0
+            for prob, child_value in zip(action_probs, child_values):
+                value += prob * child_value
             return value
 
+        # utility[action] is the vector of utilities for each player, given this action
+        # (the pruned actions are left at zero, as their probability or the reach here makes them irrelevant)
+        utility = np.zeros((state.max_actions(), self.n_players))
+        actions = [action for action, _ in edges]
+        for action, child_value in zip(actions, child_values):
+            utility[action] = child_value
+
+        # Compute regrets at this state.
+        # (fetched only now, as a packed policy may have reallocated its tables while visiting the children)
+        regrets = self.policy.regrets(inf_set)
+        # the reach vector is the probability that each player played to get here
+        # but for the current state we exclude the current player, who is assumed to have played that move intentionally with p=1
+        cfr_prob = self.others_reach(reach, player)
+
+        # the value is a vector with the value for each player calculated by mutiplying the utility by the probability of selecting the action
+        # value = [u * p for player in range()]
+        policy_vec = action_probs
+        value = [sum(utility[action][player] * policy_vec[action] for action in actions) for player in
+                 range(self.n_players)]
+        value = np.array(value)
+        info_set_logger.info("value=%r", value)
+        if self.update_player is None or self.update_player == player:
+            for action in actions:
+                regrets[action] += cfr_prob * (utility[action][player] - value[player])
 
-def run_easy_cfr(state_factory, n_iterations: int = 100) -> InfoSetTabularPolicy:
-    policy = InfoSetTabularPolicy()
+        # Return the value of this state for all players.
+        return value
+
+
+def cfr_plus_iteration(full_cfr: FullCFR, state: GameModel, step: int) -> npt.NDArray:
+    """One CFR+ iteration: a regret-matching+ pass per player in turn, then a linearly weighted average"""
+    policy = full_cfr.policy
+    values = None
+    for player in range(full_cfr.n_players):
+        full_cfr.update_player = player
+        values = full_cfr.calc_cfr(state, np.ones(full_cfr.n_players + 1))
+        policy.clamp_regrets()
+        # the other players' regrets haven't changed, so neither will their current policy
+        policy.regret_match()
+    full_cfr.update_player = None
+    # iteration t gets weight t + 1, i.e. the average moves towards the current policy by 2 / (t + 2)
+    policy.average(2 / (step + 2))
+    return values
+
+
+# the latest running sum of the DCFR average weights per gamma, as (t, sum of i^gamma for i = 2 .. t + 1)
+_DCFR_WEIGHT_SUMS: Dict[float, Tuple[int, float]] = {}
+
+
+def dcfr_average_lr(step: int, gamma: float) -> float:
+    """
+    The weight of the newest policy in the DCFR average. Discounting the average by (t / (t + 1))^gamma on each
+    iteration t = step + 1 leaves iteration i with weight proportional to (i + 1)^gamma. The sum of those weights
+    is carried on from the previous call, so consecutive steps cost O(1) each rather than O(step).
+    """
+    t = step + 1
+    done, total = _DCFR_WEIGHT_SUMS.get(gamma, (0, 0.0))
+    if done > t:
+        done, total = 0, 0.0
+    for i in range(done + 2, t + 2):
+        total += i ** gamma
+    _DCFR_WEIGHT_SUMS[gamma] = (t, total)
+    return (t + 1) ** gamma / total
+
+
+def dcfr_iteration(full_cfr: FullCFR, state: GameModel, step: int, params: DCFRParams) -> npt.NDArray:
+    """One discounted CFR iteration: a pass per player in turn, then the regrets and the average are discounted"""
+    policy = full_cfr.policy
+    values = None
+    for player in range(full_cfr.n_players):
+        full_cfr.update_player = player
+        values = full_cfr.calc_cfr(state, np.ones(full_cfr.n_players + 1))
+        policy.regret_match()
+    full_cfr.update_player = None
+    t = step + 1
+    positive_factor = t ** params.alpha / (t ** params.alpha + 1)
+    negative_factor = t ** params.beta / (t ** params.beta + 1)
+    policy.discount_regrets(positive_factor, negative_factor)
+    policy.regret_match()
+    policy.average(dcfr_average_lr(step, params.gamma))
+    return values
+
+
+def run_easy_cfr(state_factory, n_iterations: int = 100, int_keys: bool = False,
+                 policy: Optional[InfoSetTabularPolicy] = None,
+                 variant: CFRVariant = CFRVariant.VANILLA,
+                 dcfr_params: DCFRParams = DCFRParams(),
+                 start_step: int = 0,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: float = 10.0,
+                 callback: Optional[Callable[[int, InfoSetTabularPolicy], bool]] = None,
+                 verbose: bool = True,
+                 pruning: Optional[PruningParams] = None,
+                 chance_sampling: Optional[ChanceSampling] = None,
+                 rng_state: Optional[tuple] = None) -> InfoSetTabularPolicy:
+    # pass in a policy to use a different storage backend, e.g. PackedTabularPolicy
+    # callback(step, policy) is called after each iteration, and the run stops early if it returns True
+    # pruning skips parts of the tree that (almost) can't change the regrets, see PruningParams
+    # chance_sampling walks a sample of the chance outcomes on each iteration after the first, see ChanceSampling;
+    # its random number generator starts from rng_state if given, e.g. from a checkpoint, and from the seed otherwise
+    policy = policy if policy is not None else InfoSetTabularPolicy(int_keys)
     initial_state = state_factory()
     full_cfr = FullCFR(initial_state, policy)
-
-    for step in range(n_iterations):
+    # with a checkpoint_path, the solve is saved every checkpoint_interval seconds and at the end
+    checkpointer = Checkpointer(checkpoint_path, checkpoint_interval)
+    if chance_sampling is not None:
+        full_cfr.rng = random.Random(chance_sampling.seed)
+        if rng_state is not None:
+            full_cfr.rng.setstate(rng_state)
+
+    for step in range(start_step, n_iterations):
         info_set_logger.info(f"{step=}")
         n_players = 2
         n_players_including_chance = n_players + 1
-        values = full_cfr.calc_cfr(initial_state, np.ones(n_players_including_chance))
-        policy.update(step)
+        full_cfr.pruning = pruning if pruning is not None and step % pruning.revisit_every != 0 else None
+        # the first iteration walks every outcome, so that every row exists
+        full_cfr.chance_sampling = chance_sampling if step > 0 else None
+        start = time.perf_counter()
+        n_visited = full_cfr.n_visited
+        if variant == CFRVariant.CFR_PLUS:
+            values = cfr_plus_iteration(full_cfr, initial_state, step)
+        elif variant == CFRVariant.DCFR:
+            values = dcfr_iteration(full_cfr, initial_state, step, dcfr_params)
+        else:
+            values = full_cfr.calc_cfr(initial_state, np.ones(n_players_including_chance))
+            policy.update(step)
         # policy.print()
-        print(f"{step=}, {values=}")
+        if verbose:
+            # the throughput of this iteration
+            seconds = time.perf_counter() - start
+            nodes_per_second = (full_cfr.n_visited - n_visited) / seconds
+            print(f"{step=}, {values=}, {seconds=:.3f}, {nodes_per_second=:.0f}")
         # print()
+        stop = callback is not None and callback(step, policy)
+        checkpointer.maybe_save(policy, step + 1, force=stop or step == n_iterations - 1,
+                                rng_state=full_cfr.rng.getstate() if chance_sampling is not None else None)
+        if stop:
+            break
 
     return policy
 
 
+def resume_easy_cfr(state_factory, checkpoint_path: str, n_iterations: int = 100,
+                    policy: Optional[InfoSetTabularPolicy] = None,
+                    variant: CFRVariant = CFRVariant.VANILLA,
+                    dcfr_params: DCFRParams = DCFRParams(),
+                    checkpoint_interval: float = 10.0,
+                    pruning: Optional[PruningParams] = None,
+                    chance_sampling: Optional[ChanceSampling] = None) -> InfoSetTabularPolicy:
+    """
+    Continues a run_easy_cfr solve from its checkpoint, up to n_iterations in total. A chance sampled solve
+    continues the sample sequence from the checkpoint, so it matches an uninterrupted run.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    policy = policy if policy is not None else InfoSetTabularPolicy(checkpoint.int_keys)
+    restore_tabular_policy(checkpoint, policy)
+    return run_easy_cfr(state_factory, n_iterations, policy=policy, variant=variant, dcfr_params=dcfr_params,
+                        start_step=checkpoint.next_step, checkpoint_path=checkpoint_path,
+                        checkpoint_interval=checkpoint_interval, pruning=pruning,
+                        chance_sampling=chance_sampling, rng_state=checkpoint.rng_state)
+
+
 def info_set_actions_test():
     istp = InfoSetTabularPolicy()
     pa = istp.p_actions("hello", 3)
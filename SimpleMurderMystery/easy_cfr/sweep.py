@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from easy_cfr.checkpoint import load_checkpoint, restore_tabular_policy, save_checkpoint
+from easy_cfr.exploitability import best_response
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy, run_easy_cfr, CFRVariant, DCFRParams, PruningParams
+from easy_cfr.tree_size import count_tree
+
+sweep_logger = logging.getLogger(__name__)
+
+c_handler = logging.StreamHandler()
+c_handler.setLevel(logging.DEBUG)
+
+sweep_logger.addHandler(c_handler)
+
+
+class SolverConfig(NamedTuple):
+    n_iterations: int = 100
+    variant: CFRVariant = CFRVariant.VANILLA
+    dcfr_params: DCFRParams = DCFRParams()
+    int_keys: bool = False
+    pruning: Optional[PruningParams] = None
+
+
+class SweepResult(NamedTuple):
+    params: MurderMysteryParams
+    config: SolverConfig
+    # the cache key, which also names the files holding the result and the policy
+    key: str
+    # the expected return to player 0, MurderMysteryPlayer.KILLER, when both play the average policy
+    value: float
+    exploitability: float
+    # seconds spent solving, not counting the exploitability
+    wall_time: float
+    n_nodes: int
+
+
+def param_grid(base: MurderMysteryParams = MurderMysteryParams(), **axes: List[Any]) -> List[MurderMysteryParams]:
+    """Every combination of the axis values, e.g. param_grid(n_people=[3, 4], max_turns=[5, 6]), on top of base"""
+    unknown = set(axes) - set(MurderMysteryParams._fields)
+    if unknown:
+        raise ValueError(f"not MurderMysteryParams fields: {sorted(unknown)}")
+    names = list(axes)
+    return [base._replace(**dict(zip(names, values))) for values in itertools.product(*axes.values())]
+
+
+def config_dict(config: SolverConfig) -> Dict[str, Any]:
+    return {
+        "n_iterations": config.n_iterations,
+        "variant": config.variant.name,
+        "dcfr_params": config.dcfr_params._asdict(),
+        "int_keys": config.int_keys,
+        "pruning": config.pruning._asdict() if config.pruning is not None else None,
+    }
+
+
+def sweep_key(params: MurderMysteryParams, config: SolverConfig) -> str:
+    """A hash of everything that decides the result of solving one point"""
+    spec = json.dumps({"params": params._asdict(), "solver": config_dict(config)}, sort_keys=True)
+    return hashlib.sha256(spec.encode()).hexdigest()[:20]
+
+
+class SweepCache:
+    """
+    A directory holding, for each solved point, <key>.json with the SweepResult and <key>.npz with a checkpoint
+    of the policy. The .json is written last, so a point only counts as solved once both are complete.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def result_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def policy_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.npz")
+
+    def get(self, params: MurderMysteryParams, config: SolverConfig) -> Optional[SweepResult]:
+        key = sweep_key(params, config)
+        if not os.path.exists(self.result_path(key)):
+            return None
+        with open(self.result_path(key)) as f:
+            stored = json.load(f)
+        return SweepResult(params, config, key, stored["value"], stored["exploitability"], stored["wall_time"],
+                           stored["n_nodes"])
+
+    def put(self, result: SweepResult, policy: InfoSetTabularPolicy) -> None:
+        save_checkpoint(self.policy_path(result.key), policy, result.config.n_iterations)
+        stored = {"params": result.params._asdict(), "solver": config_dict(result.config),
+                  "value": result.value, "exploitability": result.exploitability,
+                  "wall_time": result.wall_time, "n_nodes": result.n_nodes}
+        tmp_path = f"{self.result_path(result.key)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stored, f, indent=2)
+        os.replace(tmp_path, self.result_path(result.key))
+
+    def policy(self, result: SweepResult) -> InfoSetTabularPolicy:
+        checkpoint = load_checkpoint(self.policy_path(result.key))
+        return restore_tabular_policy(checkpoint, InfoSetTabularPolicy(checkpoint.int_keys))
+
+
+def solve_point(params: MurderMysteryParams, config: SolverConfig, cache_path: str) -> SweepResult:
+    """Solves one point and stores it in the cache; runs in the worker processes"""
+    state_factory = partial(MurderGameModel, params)
+    start = time.perf_counter()
+    policy = run_easy_cfr(state_factory, config.n_iterations, int_keys=config.int_keys, variant=config.variant,
+                          dcfr_params=config.dcfr_params, verbose=False, pruning=config.pruning)
+    wall_time = time.perf_counter() - start
+    response = best_response(state_factory(), policy)
+    result = SweepResult(params, config, sweep_key(params, config),
+                         value=float(response.policy_values()[0]),
+                         exploitability=response.exploitability(),
+                         wall_time=wall_time,
+                         n_nodes=response.arena.n_nodes)
+    SweepCache(cache_path).put(result, policy)
+    return result
+
+
+def run_sweep(grid: List[MurderMysteryParams], config: SolverConfig = SolverConfig(), cache_path: str = "sweep_cache",
+              max_workers: Optional[int] = None, max_nodes: Optional[int] = None) -> List[SweepResult]:
+    """
+    Solves each point of the grid that isn't already in the cache, in a process pool, and returns the results in
+    grid order. With max_nodes, points whose tree (counted without building it) is bigger are left out.
+    """
+    cache = SweepCache(cache_path)
+    results: Dict[MurderMysteryParams, SweepResult] = {}
+    todo = []
+    for params in dict.fromkeys(grid):
+        if max_nodes is not None and count_tree(params).n_nodes > max_nodes:
+            sweep_logger.warning(f"skipping {params}: more than {max_nodes} nodes")
+            continue
+        cached = cache.get(params, config)
+        if cached is not None:
+            results[params] = cached
+        else:
+            todo.append(params)
+    sweep_logger.info(f"{len(results)} points cached, {len(todo)} to solve")
+    if todo:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for result in executor.map(solve_point, todo, itertools.repeat(config), itertools.repeat(cache_path)):
+                results[result.params] = result
+    return [results[params] for params in grid if params in results]
+
+
+if __name__ == '__main__':
+    sweep_logger.setLevel(logging.INFO)
+    grid = param_grid(MurderMysteryParams(allow_pass=True), allow_suicide=[False, True], n_people=[3, 4],
+                      max_turns=[5, 6, 7])
+    for result in run_sweep(grid, SolverConfig(n_iterations=100), max_nodes=100_000):
+        p = result.params
+        print(f"{p.allow_suicide=}, {p.n_people=}, {p.max_turns=}: value={result.value:.3f}, "
+              f"exploitability={result.exploitability:.4f}, wall_time={result.wall_time:.2f}, {result.n_nodes=}")
@@ -0,0 +1,45 @@
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.arena_cfr import run_arena_cfr
+from easy_cfr.game_and_agent_interfaces import Player
+from easy_cfr.game_tree_arena import compile_game_tree
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.policy_utils import run_cfr, PolicyHelper
+from easy_cfr.simpler_cfr import run_easy_cfr
+
+
+class TestGameTreeArena(unittest.TestCase):
+
+    def test_kuhn_poker_arena(self):
+        arena = compile_game_tree(KuhnPoker())
+        self.assertEqual(arena.n_nodes, 58)
+        self.assertEqual(arena.n_info_sets, 12)
+        self.assertEqual(np.sum(arena.player == Player.TERMINAL), 30)
+        # breadth first: parents come first and each node's children are contiguous
+        self.assertTrue(np.all(arena.parent[1:] < np.arange(1, arena.n_nodes)))
+        self.assertTrue(np.all(np.diff(arena.depth) >= 0))
+        for node in range(arena.n_nodes):
+            children = np.nonzero(arena.parent == node)[0]
+            if len(children):
+                self.assertEqual(children[0], arena.first_child[node])
+                self.assertEqual(len(children), arena.n_children[node])
+                self.assertEqual(children[-1] - children[0] + 1, len(children))
+
+    def test_arena_cfr_matches_full_cfr(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=3, max_turns=6)
+        deeper = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=7)
+        for state_factory in [KuhnPoker, partial(MurderGameModel, params), partial(MurderGameModel, deeper)]:
+            expected = run_easy_cfr(state_factory, 10)
+            policy = run_arena_cfr(state_factory, 10)
+            self.assertEqual(expected.policy_dict.keys(), policy.policy_dict.keys())
+            for key, probs in expected.policy_dict.items():
+                np.testing.assert_allclose(probs, policy.policy_dict[key], atol=1e-12)
+
+    def test_arena_cfr_with_my_policy(self):
+        expected = run_cfr(KuhnPoker, 10)
+        policy = run_arena_cfr(KuhnPoker, 10, PolicyHelper().get_policy(KuhnPoker()))
+        np.testing.assert_allclose(expected.policy, policy.policy, atol=1e-12)
@@ -0,0 +1,57 @@
+import itertools
+import unittest
+
+from easy_cfr.game_and_agent_interfaces import GameModel
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams, BitsetMurderGameModel, make_murder_game
+
+
+def assert_same_tree(test: unittest.TestCase, a: GameModel, b: GameModel) -> int:
+    """Walks both trees in lockstep, checking every node agrees; returns the number of nodes visited"""
+    test.assertEqual(a.is_terminal(), b.is_terminal())
+    test.assertEqual(a.current_player(), b.current_player())
+    test.assertEqual(a.information_set(), b.information_set())
+    test.assertEqual(a.returns(), b.returns())
+    if a.is_terminal():
+        return 1
+    test.assertEqual(a.actions(), b.actions())
+    return 1 + sum(assert_same_tree(test, a.child(action), b.child(action)) for action in a.actions())
+
+
+class TestBitsetMurderGame(unittest.TestCase):
+
+    def test_backend_selection(self):
+        params = MurderMysteryParams(n_people=3)
+        self.assertIsInstance(make_murder_game(params, backend="bitset"), BitsetMurderGameModel)
+        self.assertNotIsInstance(make_murder_game(params), BitsetMurderGameModel)
+
+    def test_same_tree_as_set_backend(self):
+        for allow_pass, allow_suicide in itertools.product([True, False], [True, False]):
+            params = MurderMysteryParams(allow_pass=allow_pass, allow_suicide=allow_suicide, n_people=4, max_turns=6)
+            n_nodes = assert_same_tree(self, MurderGameModel(params), BitsetMurderGameModel(params))
+            self.assertGreater(n_nodes, 1)
+
+    def test_same_tree_with_eight_people(self):
+        # with more people the action sets outgrow the smallest hash table, which moves the pass action around
+        for allow_pass in [True, False]:
+            params = MurderMysteryParams(allow_pass=allow_pass, allow_suicide=False, n_people=8, max_turns=3)
+            n_nodes = assert_same_tree(self, MurderGameModel(params), BitsetMurderGameModel(params))
+            self.assertGreater(n_nodes, 1)
+
+    def test_copy_is_independent(self):
+        model = BitsetMurderGameModel(MurderMysteryParams(n_people=4))
+        model.act(2)
+        child = model.child(1)
+        self.assertEqual(model.state.moves, [2])
+        self.assertEqual(child.state.moves, [2, 1])
+        self.assertEqual(model.state.alive, 0b1111)
+        self.assertEqual(child.state.alive, 0b1101)
+        self.assertEqual(child.state.dead, 0b0010)
+
+    def test_copies_share_zobrist_tables(self):
+        params = MurderMysteryParams(n_people=8, max_turns=8)
+        for model in [MurderGameModel(params), BitsetMurderGameModel(params)]:
+            model.act(2)
+            child = model.child(1)
+            self.assertIs(child.move_keys, model.move_keys)
+            self.assertIs(child.killer_keys, model.killer_keys)
+            self.assertEqual(child.public_key, model.move_keys[1][1])
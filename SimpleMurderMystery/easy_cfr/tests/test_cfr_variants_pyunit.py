@@ -0,0 +1,63 @@
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.evaluate_policies import evaluate
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.packed_policy import PackedTabularPolicy
+from easy_cfr.simpler_cfr import run_easy_cfr, CFRVariant, TabularPolicyPlayer, InfoSetTabularPolicy, dcfr_average_lr, \
+    DCFRParams
+
+KUHN_POKER_VALUE = -1 / 18
+
+
+def self_play_value(policy: InfoSetTabularPolicy) -> float:
+    player = TabularPolicyPlayer(policy)
+    return evaluate(KuhnPoker(), player, player, player_role=0)
+
+
+class TestCFRVariants(unittest.TestCase):
+
+    def test_cfr_plus_kuhn_poker(self):
+        vanilla = run_easy_cfr(KuhnPoker, 100)
+        cfr_plus = run_easy_cfr(KuhnPoker, 100, variant=CFRVariant.CFR_PLUS)
+        self.assertAlmostEqual(self_play_value(cfr_plus), KUHN_POKER_VALUE, places=3)
+        self.assertLess(abs(self_play_value(cfr_plus) - KUHN_POKER_VALUE),
+                        abs(self_play_value(vanilla) - KUHN_POKER_VALUE))
+
+    def test_cfr_plus_murder_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        for policy in [InfoSetTabularPolicy(), PackedTabularPolicy()]:
+            run_easy_cfr(partial(MurderGameModel, params), 10, policy=policy, variant=CFRVariant.CFR_PLUS)
+            for key, regrets in policy.regret_dict.items():
+                self.assertTrue(np.all(regrets >= 0))
+                self.assertAlmostEqual(np.sum(policy.policy_dict[key]), 1.0)
+
+    def test_dcfr_average_weights(self):
+        self.assertAlmostEqual(dcfr_average_lr(0, gamma=2.0), 1.0)
+        # iterations 1 and 2 have weights 2^2 and 3^2
+        self.assertAlmostEqual(dcfr_average_lr(1, gamma=2.0), 9 / 13)
+        # with gamma = 0 the average has equal weights, as in vanilla CFR
+        self.assertAlmostEqual(dcfr_average_lr(9, gamma=0.0), 1 / 10)
+        # the running sum carries on from the last step asked for, and starts again for an earlier one
+        self.assertAlmostEqual(dcfr_average_lr(2, gamma=2.0), 16 / 29)
+        self.assertAlmostEqual(dcfr_average_lr(1, gamma=2.0), 9 / 13)
+
+    def test_discount_regrets(self):
+        for policy in [InfoSetTabularPolicy(), PackedTabularPolicy()]:
+            policy.p_actions("a", 3)
+            policy.regrets("a")[:] = [4.0, -4.0, 0.0]
+            policy.discount_regrets(0.5, 0.25)
+            np.testing.assert_allclose(policy.regrets("a"), [2.0, -1.0, 0.0])
+            policy.scale_regrets(3.0)
+            np.testing.assert_allclose(policy.regrets("a"), [6.0, -3.0, 0.0])
+
+    def test_dcfr(self):
+        dcfr = run_easy_cfr(KuhnPoker, 100, variant=CFRVariant.DCFR)
+        self.assertAlmostEqual(self_play_value(dcfr), KUHN_POKER_VALUE, places=2)
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        policy = run_easy_cfr(partial(MurderGameModel, params), 10, policy=PackedTabularPolicy(),
+                              variant=CFRVariant.DCFR, dcfr_params=DCFRParams(alpha=1.0, beta=0.5, gamma=1.0))
+        np.testing.assert_allclose(np.sum(policy.average_table[:policy.n_rows], axis=1), 1.0)
@@ -0,0 +1,57 @@
+import copy
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.exploitability import exploitability
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.simpler_cfr import run_easy_cfr, ChanceSampling, FullCFR
+
+PARAMS = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=4, max_turns=5)
+
+
+class ForcedSample:
+    # stands in for the random number generator, to pick the sampled outcome
+    def __init__(self, index: int):
+        self.index = index
+
+    def sample(self, population, k):
+        return [population[self.index]]
+
+
+class TestChanceSampling(unittest.TestCase):
+
+    def test_all_outcomes_is_full_width(self):
+        state_factory = partial(MurderGameModel, PARAMS)
+        full = run_easy_cfr(state_factory, 5, verbose=False)
+        sampled = run_easy_cfr(state_factory, 5, verbose=False, chance_sampling=ChanceSampling(PARAMS.n_people))
+        for key, average in full.policy_dict.items():
+            np.testing.assert_array_equal(sampled.policy_dict[key], average)
+
+    def test_unbiased_regrets(self):
+        state_factory = partial(MurderGameModel, PARAMS)
+        start = run_easy_cfr(state_factory, 3, verbose=False)
+
+        def regret_increments(chance_sampling=None, index=0):
+            policy = copy.deepcopy(start)
+            full_cfr = FullCFR(state_factory(), policy)
+            full_cfr.chance_sampling = chance_sampling
+            full_cfr.rng = ForcedSample(index)
+            full_cfr.calc_cfr(state_factory(), np.ones(3))
+            return {key: policy.regret_dict[key] - start.regret_dict[key] for key in start.regret_dict}
+
+        full = regret_increments()
+        samples = [regret_increments(ChanceSampling(1), i) for i in range(PARAMS.n_people)]
+        for key, increment in full.items():
+            mean = sum(sample[key] for sample in samples) / PARAMS.n_people
+            np.testing.assert_allclose(mean, increment, atol=1e-12)
+
+    def test_kuhn_poker_converges(self):
+        policy = run_easy_cfr(KuhnPoker, 1000, verbose=False, chance_sampling=ChanceSampling(1, seed=0))
+        self.assertLess(exploitability(KuhnPoker(), policy), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.checkpoint import load_checkpoint
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.packed_policy import PackedTabularPolicy
+from easy_cfr.policy_utils import run_cfr, resume_cfr
+from easy_cfr.simpler_cfr import run_easy_cfr, resume_easy_cfr, CFRVariant, ChanceSampling
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "solve.npz")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_resume_easy_cfr(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        cases = [(KuhnPoker, False, CFRVariant.VANILLA), (partial(MurderGameModel, params), True, CFRVariant.CFR_PLUS)]
+        for state_factory, int_keys, variant in cases:
+            with contextlib.redirect_stdout(io.StringIO()):
+                uninterrupted = run_easy_cfr(state_factory, 10, int_keys=int_keys, variant=variant)
+                run_easy_cfr(state_factory, 4, int_keys=int_keys, variant=variant, checkpoint_path=self.path)
+                self.assertEqual(load_checkpoint(self.path).next_step, 4)
+                resumed = resume_easy_cfr(state_factory, self.path, 10, policy=PackedTabularPolicy(int_keys),
+                                          variant=variant)
+            self.assertFalse(os.path.exists(self.path + ".tmp"))
+            self.assertEqual(load_checkpoint(self.path).next_step, 10)
+            self.assertEqual(list(uninterrupted.policy_dict), list(resumed.policy_dict))
+            for key, average in uninterrupted.policy_dict.items():
+                np.testing.assert_array_equal(resumed.policy_dict[key], average)
+                np.testing.assert_array_equal(resumed.regrets(key), uninterrupted.regrets(key))
+                self.assertEqual(resumed.key_label(key), uninterrupted.key_label(key))
+
+    def test_resume_chance_sampled(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=4, max_turns=5)
+        state_factory = partial(MurderGameModel, params)
+        sampling = ChanceSampling(1, seed=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            uninterrupted = run_easy_cfr(state_factory, 10, chance_sampling=sampling)
+            run_easy_cfr(state_factory, 4, chance_sampling=sampling, checkpoint_path=self.path)
+            self.assertIsNotNone(load_checkpoint(self.path).rng_state)
+            resumed = resume_easy_cfr(state_factory, self.path, 10, chance_sampling=sampling)
+        for key, average in uninterrupted.policy_dict.items():
+            np.testing.assert_array_equal(resumed.policy_dict[key], average)
+            np.testing.assert_array_equal(resumed.regrets(key), uninterrupted.regrets(key))
+
+    def test_resume_run_cfr(self):
+        uninterrupted = run_cfr(KuhnPoker, 10)
+        run_cfr(KuhnPoker, 6, checkpoint_path=self.path)
+        resumed = resume_cfr(KuhnPoker, self.path, 10)
+        self.assertEqual(resumed.info_sets, uninterrupted.info_sets)
+        np.testing.assert_array_equal(resumed.policy, uninterrupted.policy)
+        np.testing.assert_array_equal(resumed.regrets, uninterrupted.regrets)
+
+
+if __name__ == '__main__':
+    unittest.main()
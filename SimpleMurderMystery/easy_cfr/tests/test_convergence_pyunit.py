@@ -0,0 +1,36 @@
+import contextlib
+import io
+import unittest
+
+from easy_cfr.convergence import run_until_converged, StoppingCriteria
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.simpler_cfr import CFRVariant
+
+
+class TestConvergence(unittest.TestCase):
+
+    def test_stops_at_target_exploitability(self):
+        criteria = StoppingCriteria(target_exploitability=0.01, check_every=5)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            _, trace = run_until_converged(KuhnPoker, 1000, criteria, variant=CFRVariant.CFR_PLUS)
+        self.assertEqual(output.getvalue(), "")
+        self.assertLess(trace[-1].iteration, 1000)
+        self.assertLessEqual(trace[-1].exploitability, 0.01)
+        self.assertTrue(all(point.exploitability > 0.01 for point in trace[:-1]))
+        self.assertEqual([point.iteration for point in trace], list(range(5, trace[-1].iteration + 1, 5)))
+        self.assertTrue(all(a.wall_time <= b.wall_time for a, b in zip(trace, trace[1:])))
+
+    def test_stops_at_target_policy_change(self):
+        criteria = StoppingCriteria(target_policy_change=1e-2, check_every=10)
+        _, trace = run_until_converged(KuhnPoker, 1000, criteria)
+        self.assertLessEqual(trace[-1].policy_change, 1e-2)
+        self.assertLess(trace[-1].iteration, 1000)
+
+    def test_trace_ends_with_final_policy(self):
+        _, trace = run_until_converged(KuhnPoker, 12, StoppingCriteria(check_every=5))
+        self.assertEqual([point.iteration for point in trace], [5, 10, 12])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import unittest
+from functools import partial
+
+from easy_cfr.evaluate_policies import evaluate, evaluate_both_roles, MemoizedEvaluator
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.policy_utils import get_policy_player, get_uniform_policy_player
+from easy_cfr.simpler_cfr import run_easy_cfr, TabularPolicyPlayer
+
+
+class TestMemoizedEvaluator(unittest.TestCase):
+
+    def check_matches_evaluate(self, state_factory, player, opponent):
+        evaluator = MemoizedEvaluator()
+        values = evaluator.evaluate(state_factory(), player, opponent)
+        for role in [0, 1]:
+            self.assertAlmostEqual(values[role], evaluate(state_factory(), player, opponent, player_role=role))
+        self.assertEqual(evaluate_both_roles(state_factory(), player, opponent), values)
+        # the second evaluation of the pair comes from the cache
+        n_expanded = evaluator.n_expanded
+        self.assertEqual(evaluator.evaluate(state_factory(), player, opponent), values)
+        self.assertEqual(evaluator.n_expanded, n_expanded)
+
+    def test_kuhn_poker(self):
+        self.check_matches_evaluate(KuhnPoker, get_policy_player(KuhnPoker, 20), get_uniform_policy_player(KuhnPoker))
+
+    def test_murder_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        state_factory = partial(MurderGameModel, params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            player = TabularPolicyPlayer(run_easy_cfr(state_factory, 10))
+        self.check_matches_evaluate(state_factory, player, get_uniform_policy_player(state_factory))
+
+    def test_players_keyed_separately(self):
+        player = get_policy_player(KuhnPoker, 20)
+        uniform = get_uniform_policy_player(KuhnPoker)
+        evaluator = MemoizedEvaluator()
+        self.assertNotEqual(evaluator.evaluate(KuhnPoker(), player, uniform),
+                            evaluator.evaluate(KuhnPoker(), uniform, player))
+
+
+if __name__ == '__main__':
+    unittest.main()
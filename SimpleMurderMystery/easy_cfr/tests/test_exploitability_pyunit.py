@@ -0,0 +1,45 @@
+import contextlib
+import io
+import unittest
+from functools import partial
+
+from easy_cfr.exploitability import best_response, exploitability, nash_conv
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.policy_utils import run_cfr
+from easy_cfr.simpler_cfr import run_easy_cfr, CFRVariant
+
+
+class TestExploitability(unittest.TestCase):
+
+    def test_kuhn_poker(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            uniform = run_easy_cfr(KuhnPoker, 1)
+            uniform.force_random()
+            cfr_plus = run_easy_cfr(KuhnPoker, 100, variant=CFRVariant.CFR_PLUS)
+        # the known exploitability of the uniform random policy
+        self.assertAlmostEqual(exploitability(KuhnPoker(), uniform), 11 / 24)
+        self.assertLess(exploitability(KuhnPoker(), cfr_plus), 0.002)
+
+    def test_policy_types_agree(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            tabular = run_easy_cfr(KuhnPoker, 20)
+        my_policy = run_cfr(KuhnPoker, 20)
+        self.assertAlmostEqual(nash_conv(KuhnPoker(), tabular), nash_conv(KuhnPoker(), my_policy))
+
+    def test_murder_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=3, max_turns=6)
+        state_factory = partial(MurderGameModel, params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            policy = run_easy_cfr(state_factory, 1)
+            br = best_response(state_factory(), policy)
+            before = br.nash_conv()
+            run_easy_cfr(state_factory, 50, policy=policy, start_step=1)
+        # the best response is bound to the policy, so it sees the later iterations
+        after = br.nash_conv()
+        self.assertGreaterEqual(after, 0)
+        self.assertLess(after, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import contextlib
+import io
+import unittest
+
+from easy_cfr.hogwild_mccfr import SharedMCCFRTables, run_hogwild_mccfr
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.mccfr import MCCFRSampling
+from easy_cfr.simpler_cfr import run_easy_cfr
+from easy_cfr.tests.test_cfr_variants_pyunit import self_play_value, KUHN_POKER_VALUE
+
+
+class TestHogwildMCCFR(unittest.TestCase):
+
+    def test_shared_tables(self):
+        index = {"a": 0, "b": 1}
+        tables = SharedMCCFRTables(index, 3)
+        attached = SharedMCCFRTables(index, 3, tables.name)
+        attached.regrets("b", 3)[:] += [1.0, 2.0, 3.0]
+        self.assertEqual(list(tables.regret_dict["b"]), [1.0, 2.0, 3.0])
+        self.assertEqual(list(tables.strategy_sum("a", 3)), [0.0, 0.0, 0.0])
+        attached.close()
+        tables.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedMCCFRTables(index, 3, tables.name)
+
+    def test_kuhn_poker(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            policy = run_hogwild_mccfr(KuhnPoker, 6000, MCCFRSampling.EXTERNAL, n_workers=2, seed=1)
+        self.assertAlmostEqual(self_play_value(policy), KUHN_POKER_VALUE, delta=0.03)
+        # a row per decision information set, none for the chance and terminal nodes
+        self.assertEqual(set(policy.policy_dict), set(run_easy_cfr(KuhnPoker, 1, verbose=False).policy_dict))
+
+
+if __name__ == '__main__':
+    unittest.main()
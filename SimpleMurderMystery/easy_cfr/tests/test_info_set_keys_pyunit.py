@@ -0,0 +1,55 @@
+import unittest
+from typing import Dict
+
+import numpy as np
+
+from easy_cfr.game_and_agent_interfaces import GameModel
+from easy_cfr.info_set_keys import InfoSetInterner, stable_hash
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams, BitsetMurderGameModel
+from easy_cfr.simpler_cfr import run_easy_cfr
+
+
+def check_keys(test: unittest.TestCase, state: GameModel, key_of: Dict[str, int], label_of: Dict[int, str]) -> None:
+    """Checks that the integer keys and the information set strings identify the same sets"""
+    label, key = state.information_set(), state.information_set_key()
+    test.assertEqual(key_of.setdefault(label, key), key)
+    test.assertEqual(label_of.setdefault(key, label), label)
+    if not state.is_terminal():
+        for action in state.actions():
+            state.apply(action)
+            check_keys(test, state, key_of, label_of)
+            state.undo()
+
+
+class TestInfoSetKeys(unittest.TestCase):
+
+    def test_stable_hash(self):
+        self.assertEqual(stable_hash("[0, -1]k=2"), stable_hash("[0, -1]k=2"))
+        self.assertNotEqual(stable_hash("[0, -1]k=2"), stable_hash("[0, -1]k=1"))
+
+    def test_keys_match_strings(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=4, max_turns=6)
+        for state in [KuhnPoker(), MurderGameModel(params), BitsetMurderGameModel(params)]:
+            key_of, label_of = {}, {}
+            check_keys(self, state, key_of, label_of)
+            self.assertEqual(len(key_of), len(label_of))
+
+    def test_interner(self):
+        interner = InfoSetInterner()
+        state = KuhnPoker()
+        state.act(2)
+        state.act(0)
+        self.assertEqual(interner.row(state), 0)
+        self.assertEqual(interner.row(state), 0)
+        state.act(1)
+        self.assertEqual(interner.row(state), 1)
+        self.assertEqual(interner.label(1), "0b")
+        self.assertEqual(len(interner), 2)
+
+    def test_int_key_cfr(self):
+        expected = run_easy_cfr(KuhnPoker, 20)
+        policy = run_easy_cfr(KuhnPoker, 20, int_keys=True)
+        self.assertEqual(len(expected.policy_dict), len(policy.policy_dict))
+        for key, probs in policy.policy_dict.items():
+            np.testing.assert_allclose(expected.policy_dict[policy.key_label(key)], probs)
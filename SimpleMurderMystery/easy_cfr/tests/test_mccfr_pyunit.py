@@ -0,0 +1,36 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.mccfr import run_mccfr, MCCFRSampling, ExternalSamplingMCCFR
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.tests.test_cfr_variants_pyunit import self_play_value, KUHN_POKER_VALUE
+
+
+class TestMCCFR(unittest.TestCase):
+
+    def test_kuhn_poker(self):
+        for sampling in MCCFRSampling:
+            with contextlib.redirect_stdout(io.StringIO()):
+                policy = run_mccfr(KuhnPoker, 5000, sampling, seed=1)
+            self.assertEqual(len(policy.policy_dict), 12)
+            self.assertAlmostEqual(self_play_value(policy), KUHN_POKER_VALUE, delta=0.03)
+
+    def test_murder_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=4, max_turns=6)
+        solver = ExternalSamplingMCCFR(MurderGameModel(params), int_keys=True, seed=1)
+        state = solver.state
+        solver.run(20)
+        # the root state is walked in place and restored after every traversal
+        self.assertEqual(state.information_set(), MurderGameModel(params).information_set())
+        policy = solver.to_policy()
+        for key, row in policy.policy_dict.items():
+            self.assertAlmostEqual(np.sum(row), 1.0)
+            self.assertIn(key, policy.labels)
+
+
+if __name__ == '__main__':
+    unittest.main()
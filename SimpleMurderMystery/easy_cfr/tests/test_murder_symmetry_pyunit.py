@@ -0,0 +1,50 @@
+import contextlib
+import io
+import unittest
+from functools import partial
+
+from easy_cfr.evaluate_policies import evaluate
+from easy_cfr.exploitability import exploitability
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.murder_symmetry import canonical_people, SymmetricMurderGameModel, SymmetricPlayer
+from easy_cfr.simpler_cfr import run_easy_cfr, TabularPolicyPlayer
+
+
+class TestMurderSymmetry(unittest.TestCase):
+
+    def test_canonical_people(self):
+        # the killer comes first in their own view, then people by first appearance, then the rest
+        self.assertEqual(canonical_people([1, 2, 0, 2], 1, 4, -1, killer_view=True), [1, 2, 0, 3])
+        self.assertEqual(canonical_people([1, 2, -1, 0], 1, 4, -1, killer_view=False), [2, 0, 1, 3])
+
+    def test_equivalent_histories_share_info_sets(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=4)
+        infos = []
+        for killer, victim in [(1, 2), (2, 1)]:
+            game = SymmetricMurderGameModel(params)
+            game.apply(killer)
+            # the killer's first kill, made with the canonical label of the victim
+            label = game.canonical_actions([victim])[0]
+            game.apply(label)
+            self.assertNotIn(victim, game.game.state.alive)
+            infos.append(game.information_set())
+        self.assertEqual(infos[0], infos[1])
+
+    def test_solve_matches_plain_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=4, max_turns=6)
+        plain_factory = partial(MurderGameModel, params)
+        symmetric_factory = partial(SymmetricMurderGameModel, params, backend="bitset")
+        with contextlib.redirect_stdout(io.StringIO()):
+            plain = run_easy_cfr(plain_factory, 10)
+            symmetric = run_easy_cfr(symmetric_factory, 10)
+        self.assertLess(len(symmetric.policy_dict), len(plain.policy_dict) / 10)
+        self.assertAlmostEqual(exploitability(symmetric_factory(), symmetric), exploitability(plain_factory(), plain))
+        # and the symmetric policy plays the same in the ordinary game
+        player = TabularPolicyPlayer(symmetric)
+        for role in [0, 1]:
+            self.assertAlmostEqual(evaluate(plain_factory(), SymmetricPlayer(player), SymmetricPlayer(player), role),
+                                   evaluate(symmetric_factory(), player, player, role))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.arena_cfr import run_arena_cfr
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.packed_policy import PackedTabularPolicy
+from easy_cfr.simpler_cfr import run_easy_cfr, TabularPolicyPlayer
+
+
+class TestPackedTabularPolicy(unittest.TestCase):
+
+    def test_rows_grow_in_chunks(self):
+        policy = PackedTabularPolicy(chunk_rows=2)
+        for key in ["a", "b", "c"]:
+            np.testing.assert_allclose(policy.p_actions(key, 4), 0.25)
+        policy.regrets("b")[1] += 3.0
+        policy.update(0)
+        self.assertEqual(policy.n_rows, 3)
+        self.assertEqual(policy.regret_table.shape, (4, 4))
+        self.assertAlmostEqual(policy.policy_dict["b"][1], 1.0)
+        np.testing.assert_allclose(policy.p_action_dict["c"], 0.25)
+        self.assertEqual(set(policy.policy_dict.keys()), {"a", "b", "c"})
+
+    def test_matches_dict_policy(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=3, max_turns=6)
+        for state_factory in [KuhnPoker, partial(MurderGameModel, params)]:
+            expected = run_easy_cfr(state_factory, 10)
+            policy = run_easy_cfr(state_factory, 10, policy=PackedTabularPolicy(chunk_rows=5))
+            arena_policy = run_arena_cfr(state_factory, 10, PackedTabularPolicy())
+            self.assertEqual(len(expected.policy_dict), len(policy.policy_dict))
+            for key, probs in expected.policy_dict.items():
+                np.testing.assert_allclose(probs, policy.policy_dict[key], atol=1e-12)
+                np.testing.assert_allclose(probs, arena_policy.policy_dict[key], atol=1e-12)
+
+    def test_player(self):
+        player = TabularPolicyPlayer(run_easy_cfr(KuhnPoker, 5, policy=PackedTabularPolicy(int_keys=True)))
+        state = KuhnPoker()
+        state.act(0)
+        state.act(1)
+        self.assertAlmostEqual(sum(p for a, p in player.get_action_probs(state)), 1.0)
@@ -0,0 +1,40 @@
+import contextlib
+import io
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.packed_policy import PackedTabularPolicy
+from easy_cfr.parallel_cfr import chance_frontier, run_parallel_cfr
+from easy_cfr.simpler_cfr import run_easy_cfr
+
+
+class TestParallelCFR(unittest.TestCase):
+
+    def test_chance_frontier(self):
+        params = MurderMysteryParams(n_people=4)
+        frontier = chance_frontier(MurderGameModel(params))
+        self.assertEqual([prefix for prefix, _ in frontier], [(0,), (1,), (2,), (3,)])
+        # both cards of the Kuhn poker deal are expanded
+        frontier = chance_frontier(KuhnPoker())
+        self.assertEqual(len(frontier), 6)
+        self.assertAlmostEqual(sum(prob for _, prob in frontier), 1.0)
+
+    def test_matches_sequential_cfr(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        for state_factory in [KuhnPoker, partial(MurderGameModel, params)]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                sequential = run_easy_cfr(state_factory, 10, int_keys=True)
+                parallel = run_parallel_cfr(state_factory, 10, policy=PackedTabularPolicy(int_keys=True),
+                                            max_workers=2)
+            self.assertEqual(set(sequential.policy_dict), set(parallel.policy_dict))
+            for key, average in sequential.policy_dict.items():
+                np.testing.assert_allclose(parallel.policy_dict[key], average, atol=1e-12)
+                self.assertEqual(parallel.key_label(key), sequential.key_label(key))
+
+
+if __name__ == '__main__':
+    unittest.main()
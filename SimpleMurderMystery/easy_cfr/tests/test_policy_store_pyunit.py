@@ -0,0 +1,48 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.policy_store import export_policy_store, PolicyStore, PolicyStorePlayer
+from easy_cfr.policy_utils import run_cfr
+from easy_cfr.simpler_cfr import run_easy_cfr
+
+
+class TestPolicyStore(unittest.TestCase):
+
+    def test_tabular_policy(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        for int_keys in [False, True]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                policy = run_easy_cfr(partial(MurderGameModel, params), 5, int_keys=int_keys)
+            with tempfile.TemporaryDirectory() as path:
+                self.assertEqual(export_policy_store(path, policy), len(policy.policy_dict))
+                store = PolicyStore(path)
+                self.assertIsInstance(store.probs, np.memmap)
+                for key, average in policy.policy_dict.items():
+                    np.testing.assert_allclose(store.row(key), average, rtol=1e-6)
+                with self.assertRaises(KeyError):
+                    store.row("not an information set")
+
+    def test_player(self):
+        policy = run_cfr(KuhnPoker, 10)
+        with tempfile.TemporaryDirectory() as path:
+            export_policy_store(path, policy)
+            player = PolicyStorePlayer(PolicyStore(path))
+            state = KuhnPoker()
+            # deal both cards
+            state.apply(state.chance_action_probs()[0][0])
+            state.apply(state.chance_action_probs()[0][0])
+            probs = player.get_action_probs(state)
+            expected = policy.policy[policy.index(state.information_set())]
+            np.testing.assert_allclose([p for _, p in probs], expected, rtol=1e-6)
+            self.assertIn(player.get_action(state), state.actions())
+
+
+if __name__ == '__main__':
+    unittest.main()
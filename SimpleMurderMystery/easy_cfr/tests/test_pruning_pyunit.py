@@ -0,0 +1,50 @@
+import contextlib
+import io
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.exploitability import exploitability
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.simpler_cfr import run_easy_cfr, CFRVariant, FullCFR, InfoSetTabularPolicy, PruningParams
+
+
+def run_counting(state_factory, n_iterations: int, pruning: PruningParams = None):
+    # the vanilla loop of run_easy_cfr, keeping hold of FullCFR to count the nodes visited
+    policy = InfoSetTabularPolicy()
+    state = state_factory()
+    full_cfr = FullCFR(state, policy)
+    for step in range(n_iterations):
+        full_cfr.pruning = pruning if pruning is not None and step % pruning.revisit_every != 0 else None
+        full_cfr.calc_cfr(state, np.ones(3))
+        policy.update(step)
+    return policy, full_cfr.n_visited
+
+
+class TestPruning(unittest.TestCase):
+
+    def test_exact_pruning_changes_nothing(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for variant in CFRVariant:
+                plain = run_easy_cfr(KuhnPoker, 30, variant=variant)
+                pruned = run_easy_cfr(KuhnPoker, 30, variant=variant, pruning=PruningParams(reach_threshold=0.0))
+                for key, average in plain.policy_dict.items():
+                    np.testing.assert_array_equal(pruned.policy_dict[key], average)
+
+    def test_pruning_murder_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        state_factory = partial(MurderGameModel, params)
+        plain, n_plain = run_counting(state_factory, 50)
+        for pruning in [PruningParams(), PruningParams(regret_threshold=-1e-3)]:
+            pruned, n_pruned = run_counting(state_factory, 50, pruning)
+            self.assertLess(n_pruned, n_plain / 2)
+            # every row is still created, on the first iteration
+            self.assertEqual(pruned.policy_dict.keys(), plain.policy_dict.keys())
+            self.assertAlmostEqual(exploitability(state_factory(), pruned),
+                                   exploitability(state_factory(), plain), places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.arena_cfr import ArenaCFR, bind_policy
+from easy_cfr.game_tree_arena import compile_game_tree
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.segmented_policy import SegmentedTabularPolicy, SegmentedPolicyPlayer
+from easy_cfr.simpler_cfr import run_easy_cfr
+
+
+def solve(state_factory, n_iterations: int) -> SegmentedTabularPolicy:
+    arena = compile_game_tree(state_factory())
+    policy = SegmentedTabularPolicy.from_arena(arena)
+    solver = ArenaCFR(arena, bind_policy(arena, policy))
+    for step in range(n_iterations):
+        solver.iteration(step)
+    return policy
+
+
+class TestSegmentedPolicy(unittest.TestCase):
+
+    def test_matches_padded_policy_when_all_actions_are_legal(self):
+        expected = run_easy_cfr(KuhnPoker, 20)
+        policy = solve(KuhnPoker, 20)
+        for key, probs in expected.policy_dict.items():
+            np.testing.assert_allclose(probs, policy.padded_row(key, 2), atol=1e-12)
+
+    def test_only_legal_actions_are_stored(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=4, max_turns=6)
+        arena = compile_game_tree(MurderGameModel(params))
+        policy = solve(partial(MurderGameModel, params), 10)
+        self.assertLess(len(policy.actions), arena.n_info_sets * arena.width)
+        np.testing.assert_allclose(policy.segment_sums(policy.average), 1.0)
+        np.testing.assert_allclose(policy.segment_sums(policy.current), 1.0)
+
+    def test_player(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=3, max_turns=6)
+        player = SegmentedPolicyPlayer(solve(partial(MurderGameModel, params), 5))
+        state = MurderGameModel(params)
+        state.act(1)
+        state.act(0)
+        action_probs = player.get_action_probs(state)
+        self.assertEqual([a for a, p in action_probs], state.actions())
+        self.assertAlmostEqual(sum(p for a, p in action_probs), 1.0)
+        self.assertIn(player.get_action(state), state.actions())
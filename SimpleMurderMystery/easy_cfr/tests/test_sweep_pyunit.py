@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from easy_cfr.exploitability import exploitability
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.sweep import SolverConfig, SweepCache, param_grid, run_sweep, sweep_key
+
+BASE = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=3)
+CONFIG = SolverConfig(n_iterations=5)
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = self.dir.name
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_param_grid(self):
+        grid = param_grid(BASE, max_turns=[4, 5], cost_per_death=[5, 10, 15])
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[1], BASE._replace(max_turns=4, cost_per_death=10))
+        with self.assertRaises(ValueError):
+            param_grid(BASE, n_turns=[4])
+
+    def test_key_covers_params_and_config(self):
+        keys = {sweep_key(BASE, CONFIG), sweep_key(BASE._replace(max_turns=8), CONFIG),
+                sweep_key(BASE, CONFIG._replace(n_iterations=6))}
+        self.assertEqual(len(keys), 3)
+
+    def test_only_new_points_are_solved(self):
+        results = run_sweep(param_grid(BASE, max_turns=[4, 5]), CONFIG, self.path, max_workers=1)
+        self.assertEqual(len(os.listdir(self.path)), 4)
+        first = SweepCache(self.path).result_path(results[0].key)
+        modified = os.path.getmtime(first)
+
+        grid = param_grid(BASE, max_turns=[4, 5, 6])
+        extended = run_sweep(grid, CONFIG, self.path, max_workers=1)
+        self.assertEqual([result.params for result in extended], grid)
+        self.assertEqual(extended[:2], results)
+        self.assertEqual(os.path.getmtime(first), modified)
+        self.assertEqual(len(os.listdir(self.path)), 6)
+
+        result = extended[2]
+        policy = SweepCache(self.path).policy(result)
+        self.assertAlmostEqual(exploitability(MurderGameModel(result.params), policy), result.exploitability)
+        self.assertGreater(result.n_nodes, extended[1].n_nodes)
+
+    def test_large_points_are_left_out(self):
+        grid = param_grid(BASE, max_turns=[4, 9])
+        results = run_sweep(grid, CONFIG, self.path, max_workers=1, max_nodes=1000)
+        self.assertEqual([result.params for result in results], grid[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
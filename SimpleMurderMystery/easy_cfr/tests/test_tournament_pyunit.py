@@ -0,0 +1,42 @@
+import contextlib
+import io
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.evaluate_policies import MemoizedEvaluator
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.policy_utils import get_policy_player, get_uniform_policy_player
+from easy_cfr.simpler_cfr import run_easy_cfr, TabularPolicyPlayer, CFRVariant
+from easy_cfr.tournament import tournament_matrix, tournament_values
+
+
+class TestTournament(unittest.TestCase):
+
+    def check_matches_pairwise(self, state_factory, players):
+        scores = tournament_matrix(state_factory, players)
+        evaluator = MemoizedEvaluator()
+        for i, player in enumerate(players):
+            for j, opponent in enumerate(players):
+                self.assertAlmostEqual(scores[i, j], sum(evaluator.evaluate(state_factory(), player, opponent)))
+
+    def test_kuhn_poker(self):
+        players = [get_uniform_policy_player(KuhnPoker)] + [get_policy_player(KuhnPoker, n) for n in [1, 10, 50]]
+        self.check_matches_pairwise(KuhnPoker, players)
+        values = tournament_values(KuhnPoker(), players)
+        self.assertEqual(values.shape, (4, 4, 2))
+        # Kuhn poker is zero sum
+        np.testing.assert_allclose(values[:, :, 0], -values[:, :, 1], atol=1e-12)
+
+    def test_murder_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+        state_factory = partial(MurderGameModel, params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            players = [TabularPolicyPlayer(run_easy_cfr(state_factory, 5, variant=variant)) for variant in CFRVariant]
+        self.check_matches_pairwise(state_factory, players + [get_uniform_policy_player(state_factory)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import itertools
+import unittest
+
+from easy_cfr.game_and_agent_interfaces import Player
+from easy_cfr.murder_mystery import BitsetMurderGameModel, MurderMysteryParams
+from easy_cfr.tree_size import count_tree, estimate_memory, TreeSize
+
+
+def enumerate_tree(params: MurderMysteryParams) -> TreeSize:
+    state = BitsetMurderGameModel(params)
+    counts = dict(nodes=0, terminals=0, killer=0, detective=0)
+    info_sets = {Player.P_ONE: set(), Player.P_TWO: set()}
+
+    def visit():
+        counts["nodes"] += 1
+        if state.is_terminal():
+            counts["terminals"] += 1
+            return
+        player = state.current_player()
+        if player != Player.CHANCE:
+            counts["killer" if player == Player.P_ONE else "detective"] += 1
+            info_sets[player].add(state.information_set())
+        for action in state.actions():
+            state.apply(action)
+            visit()
+            state.undo()
+
+    visit()
+    return TreeSize(counts["nodes"], counts["terminals"], counts["killer"], counts["detective"],
+                    len(info_sets[Player.P_ONE]), len(info_sets[Player.P_TWO]))
+
+
+class TestTreeSize(unittest.TestCase):
+
+    def test_matches_enumeration(self):
+        for allow_pass, allow_suicide, n_people in itertools.product([False, True], [False, True], [2, 3, 4]):
+            for max_turns in [1, 2, 5, 7]:
+                params = MurderMysteryParams(allow_pass=allow_pass, allow_suicide=allow_suicide,
+                                             n_people=n_people, max_turns=max_turns)
+                self.assertEqual(count_tree(params), enumerate_tree(params), params)
+
+    def test_large_game(self):
+        params = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=7, max_turns=12)
+        size = count_tree(params)
+        self.assertGreater(size.n_nodes, 10 ** 9)
+        self.assertLess(size.n_detective_info_sets, size.n_detective_nodes)
+        memory = estimate_memory(params, size)
+        self.assertLess(memory["packed"], memory["dict"])
+
+
+if __name__ == '__main__':
+    unittest.main()
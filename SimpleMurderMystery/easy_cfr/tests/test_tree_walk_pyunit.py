@@ -0,0 +1,112 @@
+import contextlib
+import io
+import sys
+import unittest
+from functools import partial
+from typing import List
+
+from easy_cfr.game_and_agent_interfaces import GameModel
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.policy_utils import get_info_sets
+from easy_cfr.simpler_cfr import run_easy_cfr
+from easy_cfr.tree_walk import iter_tree, walk_tree
+
+
+class Chain(GameModel):
+    # a game with one action per move, so the tree is a path as deep as length
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.moves = 0
+
+    def is_terminal(self) -> bool:
+        return self.moves == self.length
+
+    def current_player(self) -> int:
+        return self.moves % 2
+
+    def n_actions(self) -> int:
+        return 1
+
+    def max_actions(self) -> int:
+        return 1
+
+    def actions(self) -> List[int]:
+        return [0]
+
+    def act(self, action: int) -> None:
+        self.moves += 1
+
+    def apply(self, action: int) -> None:
+        self.act(action)
+
+    def undo(self) -> None:
+        self.moves -= 1
+
+    def returns(self) -> List[float]:
+        return [1.0, -1.0]
+
+    def copy_state(self) -> GameModel:
+        cp = Chain(self.length)
+        cp.moves = self.moves
+        return cp
+
+    def action_to_string(self, action) -> str:
+        return "next"
+
+    def information_set(self) -> str:
+        return str(self.moves)
+
+
+def recursive_nodes(state: GameModel, depth: int = 0, post_order: bool = False):
+    nodes = [] if post_order else [(str(state), depth)]
+    if not state.is_terminal():
+        for action in state.actions():
+            nodes += recursive_nodes(state.child(action), depth + 1, post_order)
+    return nodes + [(str(state), depth)] if post_order else nodes
+
+
+class TestTreeWalk(unittest.TestCase):
+
+    def test_iter_tree_orders(self):
+        state_factory = partial(MurderGameModel, MurderMysteryParams(allow_pass=True, n_people=3, max_turns=5))
+        for post_order in [False, True]:
+            expected = recursive_nodes(state_factory(), post_order=post_order)
+            for in_place in [True, False]:
+                state = state_factory()
+                nodes = [(str(node), depth) for node, depth in iter_tree(state, post_order, in_place)]
+                self.assertEqual(nodes, expected)
+                self.assertEqual(str(state), str(state_factory()))
+
+    def test_iter_tree_closed_early(self):
+        state = KuhnPoker()
+        walk = iter_tree(state)
+        for node, depth in walk:
+            if depth == 3:
+                break
+        walk.close()
+        self.assertEqual(str(state), str(KuhnPoker()))
+
+    def test_walk_tree_fold(self):
+        # counts the leaves below each node, and skips the subtrees below depth 2
+        def enter(state, depth):
+            edges = [] if state.is_terminal() or depth == 2 else [(a, depth + 1) for a in state.actions()]
+            return depth, edges
+
+        def leave(state, depth, values):
+            return sum(values) if values else 1
+
+        n_depth_2 = sum(1 for _, depth in iter_tree(KuhnPoker()) if depth == 2)
+        self.assertEqual(walk_tree(KuhnPoker(), enter, leave, 0), n_depth_2)
+
+    def test_deeper_than_recursion_limit(self):
+        length = 3 * sys.getrecursionlimit()
+        self.assertEqual(sum(1 for _ in iter_tree(Chain(length))), length + 1)
+        self.assertEqual(len(get_info_sets(Chain(length), {})), length + 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            policy = run_easy_cfr(partial(Chain, length), 2)
+        self.assertEqual(len(policy.policy_dict), length)
+
+
+if __name__ == '__main__':
+    unittest.main()
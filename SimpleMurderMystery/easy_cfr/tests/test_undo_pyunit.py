@@ -0,0 +1,66 @@
+import copy
+import unittest
+
+from easy_cfr.game_and_agent_interfaces import GameModel
+from easy_cfr.kuhn_poker import KuhnPoker
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams, BitsetMurderGameModel
+
+
+class CopyingKuhnPoker(KuhnPoker):
+    # uses the deepcopy fallback from the interface instead of KuhnPoker's own undo records
+    apply = GameModel.apply
+    undo = GameModel.undo
+
+
+def snapshot(state: GameModel):
+    # the murder models keep alive / dead / accused in a dataclass that compares by value
+    return (str(state), state.information_set(), state.returns(), state.current_player(),
+            copy.deepcopy(getattr(state, "state", None)))
+
+
+def check_apply_undo(test: unittest.TestCase, state: GameModel) -> int:
+    """Checks apply() matches child() and undo() restores the state, over the whole tree"""
+    if state.is_terminal():
+        return 1
+    before = snapshot(state)
+    n_nodes = 1
+    for action in state.actions():
+        expected = snapshot(state.child(action))
+        state.apply(action)
+        test.assertEqual(expected, snapshot(state))
+        n_nodes += check_apply_undo(test, state)
+        state.undo()
+        test.assertEqual(before, snapshot(state))
+    return n_nodes
+
+
+class TestApplyUndo(unittest.TestCase):
+
+    def test_kuhn_poker(self):
+        self.assertEqual(check_apply_undo(self, KuhnPoker()), 58)
+
+    def test_fallback(self):
+        self.assertEqual(check_apply_undo(self, CopyingKuhnPoker()), 58)
+
+    def test_murder_game_backends(self):
+        for allow_suicide in [True, False]:
+            params = MurderMysteryParams(allow_pass=True, allow_suicide=allow_suicide, n_people=3, max_turns=6)
+            for model in [MurderGameModel(params), BitsetMurderGameModel(params)]:
+                check_apply_undo(self, model)
+                self.assertEqual(model.state.moves, [])
+                self.assertEqual(model.undo_stack(), [])
+
+    def test_copy_has_no_undo_records(self):
+        params = MurderMysteryParams(allow_pass=True, n_people=3, max_turns=6)
+        for state in [KuhnPoker(), MurderGameModel(params), BitsetMurderGameModel(params)]:
+            state.apply(state.actions()[0])
+            state.apply(state.actions()[0])
+            cp = state.copy_state()
+            self.assertEqual(cp.undo_stack(), [])
+            with self.assertRaises(IndexError):
+                cp.undo()
+            # the original can still be rewound, and the copy keeps the moves it was made with
+            state.undo()
+            state.undo()
+            self.assertEqual(state.undo_stack(), [])
+            self.assertNotEqual(str(cp), str(state))
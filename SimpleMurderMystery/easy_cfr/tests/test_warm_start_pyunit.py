@@ -0,0 +1,47 @@
+import unittest
+from functools import partial
+
+import numpy as np
+
+from easy_cfr.exploitability import exploitability
+from easy_cfr.murder_mystery import MurderGameModel, MurderMysteryParams
+from easy_cfr.packed_policy import PackedTabularPolicy
+from easy_cfr.simpler_cfr import run_easy_cfr
+from easy_cfr.warm_start import seed_policy, run_warm_started_cfr
+
+PARAMS = MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=3, max_turns=6)
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def test_seed_matches_by_information_set(self):
+        state_factory = partial(MurderGameModel, PARAMS)
+        source = run_easy_cfr(state_factory, 10, policy=PackedTabularPolicy(int_keys=True), verbose=False)
+        seeded = seed_policy(state_factory(), source)
+        self.assertEqual(len(seeded.policy_dict), len(source.policy_dict))
+        for key, label in source.labels.items():
+            np.testing.assert_array_equal(seeded.policy_dict[label], source.policy_dict[key])
+            self.assertFalse(np.any(seeded.regret_dict[label]))
+
+    def test_new_information_sets_are_uniform(self):
+        source = run_easy_cfr(partial(MurderGameModel, PARAMS._replace(max_turns=4)), 10, verbose=False)
+        seeded = seed_policy(MurderGameModel(PARAMS), source)
+        for key, average in seeded.policy_dict.items():
+            if key not in source.policy_dict:
+                np.testing.assert_allclose(average, 1 / len(average))
+
+    def test_width_must_match(self):
+        source = run_easy_cfr(partial(MurderGameModel, PARAMS), 1, verbose=False)
+        with self.assertRaises(ValueError):
+            seed_policy(MurderGameModel(PARAMS._replace(n_people=4)), source)
+
+    def test_nearby_costs_converge_faster(self):
+        solved = run_easy_cfr(partial(MurderGameModel, PARAMS), 100, verbose=False)
+        state_factory = partial(MurderGameModel, PARAMS._replace(cost_per_accusation=15))
+        cold = run_easy_cfr(state_factory, 100, verbose=False)
+        warm = run_warm_started_cfr(state_factory, solved, 20)
+        self.assertLess(exploitability(state_factory(), warm), exploitability(state_factory(), cold) / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+
+from easy_cfr.game_and_agent_interfaces import GameModel, Player, PlayerInterface
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.policy_utils import get_policy_player, get_uniform_policy_player
+from easy_cfr.tree_walk import walk_tree
+
+
+def tournament_values(state: GameModel, players: List[PlayerInterface], n_players: int = 2) -> npt.NDArray:
+    """
+    Expected returns of every pairing of the players, from a single walk of the tree: values[i, j] holds the
+    returns for each player when players[i] is player 0 and players[j] is player 1. At each decision node the
+    action probabilities of all the players are stacked into a matrix, and the children's value matrices are
+    weighted by the row of the player acting there. state is walked in place and left unchanged.
+    """
+    k = len(players)
+
+    def enter(state: GameModel, _):
+        if state.is_terminal():
+            return None, ()
+        current = state.current_player()
+        if current == Player.CHANCE:
+            actions, chance_probs = zip(*state.chance_action_probs())
+            # every pairing sees the same chance probabilities
+            probs = np.tile(np.array(chance_probs), (k, 1))
+        else:
+            actions = state.actions()
+            probs = np.zeros((k, len(actions)))
+            for i, player in enumerate(players):
+                p = dict(player.get_action_probs(state))
+                probs[i] = [p.get(a, 0) for a in actions]
+        # only the actions some player can take
+        columns = [column for column in range(len(actions)) if np.any(probs[:, column])]
+        return (current, probs, columns), [(actions[column], None) for column in columns]
+
+    def leave(state: GameModel, context, child_values: List[npt.NDArray]) -> npt.NDArray:
+        if context is None:
+            return np.broadcast_to(np.asarray(state.returns(), dtype=float), (k, k, n_players))
+        current, probs, columns = context
+        values = np.zeros((k, k, n_players))
+        for column, child in zip(columns, child_values):
+            weights = probs[:, column]
+            if current == 0:
+                # weights by the policy in the row, i.e. the one playing as player 0
+                values += weights[:, None, None] * child
+            else:
+                values += weights[None, :, None] * child
+        return values
+
+    return walk_tree(state, enter, leave)
+
+
+def tournament_matrix(state_factory, players: List[PlayerInterface]) -> npt.NDArray:
+    """
+    scores[i, j] is the total value to players[i] of playing players[j] once in each role, as eval() returns
+    for the pair
+    """
+    values = tournament_values(state_factory(), players)
+    return values[:, :, 0] + values[:, :, 1].T
+
+
+if __name__ == '__main__':
+    params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=3, max_turns=6)
+    state_factory = partial(MurderGameModel, params)
+    candidates = [get_uniform_policy_player(state_factory)] + \
+                 [get_policy_player(state_factory, n_iterations=n) for n in [1, 10, 100]]
+    print(tournament_matrix(state_factory, candidates))
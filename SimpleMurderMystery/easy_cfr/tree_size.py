@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from easy_cfr.murder_mystery import MurderMysteryParams
+
+
+class TreeSize(NamedTuple):
+    # all nodes, including the chance root and the terminals
+    n_nodes: int
+    n_terminals: int
+    # decision nodes and information sets per player
+    n_killer_nodes: int
+    n_detective_nodes: int
+    n_killer_info_sets: int
+    n_detective_info_sets: int
+
+    @property
+    def n_info_sets(self) -> int:
+        return self.n_killer_info_sets + self.n_detective_info_sets
+
+
+class _Counts(NamedTuple):
+    nodes: int
+    terminals: int
+    killer_nodes: int
+    detective_nodes: int
+
+    def __add__(self, other: _Counts) -> _Counts:
+        return _Counts(*(a + b for a, b in zip(self, other)))
+
+    def __mul__(self, m: int) -> _Counts:
+        return _Counts(*(a * m for a in self))
+
+
+_TERMINAL = _Counts(1, 1, 0, 0)
+
+
+# The state of one history as far as the rest of the game is concerned: the move number, the number of people
+# other than the killer who are alive and not accused / alive and accused, and whether the killer is alive.
+# Histories are counted per killer, as the chance move only picks who the killer is.
+def _history_counts(params: MurderMysteryParams):
+    @lru_cache(maxsize=None)
+    def counts(move_no: int, free: int, accused: int, killer_alive: bool) -> _Counts:
+        if move_no >= params.max_turns or free + accused == 0:
+            return _TERMINAL
+        total = _Counts(1, 0, 0, 0)
+        nxt = move_no + 1
+        if params.allow_pass:
+            total += counts(nxt, free, accused, killer_alive)
+        if move_no % 2 == 1:
+            total += _Counts(0, 0, 1, 0)
+            if killer_alive:
+                if free:
+                    total += counts(nxt, free - 1, accused, True) * free
+                if accused:
+                    total += counts(nxt, free, accused - 1, True) * accused
+                if params.allow_suicide:
+                    total += counts(nxt, free, accused, False)
+            elif free + accused:
+                # a dead killer can still name anyone alive, but nothing happens
+                total += counts(nxt, free, accused, False) * (free + accused)
+        else:
+            total += _Counts(0, 0, 0, 1)
+            if free:
+                total += counts(nxt, free - 1, accused + 1, killer_alive) * free
+            if accused:
+                total += counts(nxt, free, accused, killer_alive) * accused
+            if killer_alive:
+                # accusing the killer ends the game
+                total += _TERMINAL
+        return total
+
+    return counts
+
+
+# The detective's information sets are the distinct public move sequences at detective decision nodes, which
+# are counted over belief states: everything the rest of the public sequence depends on, for all the killers
+# consistent with it. Each possible killer is a world:
+#  - while no named person has been named again or accused, the killers nobody has named are live worlds
+#    (the "unnamed" worlds) in which everyone named so far is dead
+#  - with suicide, a killer k who named themselves is a world where everyone named up to k is dead and the
+#    later kills did nothing. These worlds are only consistent while every re-named or accused person was
+#    first named after k, so they are the named killers before the first such person.
+# The belief state holds the number of unnamed people not accused (possible killers, if the unnamed worlds are
+# live) and accused, a flag per named person up to the first re-referenced one saying whether they are a
+# killer world, the number of people named after that (alive in every remaining world), and whether the
+# unnamed worlds are live. People dead in every world are dropped, as no legal move can name them.
+def _public_counts(params: MurderMysteryParams):
+
+    def normalise(free: int, accused: int, named: Tuple[bool, ...], later: int,
+                  unnamed_worlds: bool) -> Tuple[int, int, Tuple[bool, ...], int, bool]:
+        # the unnamed worlds end when nobody unnamed and unaccused is left, or only the killer is left alive
+        if unnamed_worlds and (free == 0 or free + accused == 1):
+            unnamed_worlds = False
+        if not unnamed_worlds:
+            accused += free
+            free = 0
+        # a named killer's world ends when nobody is left alive in it, which can only happen to the last named
+        if named and named[-1] and later + free + accused == 0:
+            named = named[:-1] + (False,)
+        # people named before the first named killer world are dead in every world
+        while named and not named[0]:
+            named = named[1:]
+        return free, accused, named, later, unnamed_worlds
+
+    @lru_cache(maxsize=None)
+    def counts(move_no: int, free: int, accused: int, named: Tuple[bool, ...], later: int,
+               unnamed_worlds: bool) -> int:
+        named_worlds = any(named)
+        if move_no >= params.max_turns or not (unnamed_worlds or named_worlds):
+            return 0
+        killer_move = move_no % 2 == 1
+        total = 0 if killer_move else 1
+        nxt = move_no + 1
+
+        def child(*state) -> int:
+            return counts(nxt, *normalise(*state))
+
+        if params.allow_pass:
+            total += child(free, accused, named, later, unnamed_worlds)
+        if killer_move:
+            if free and (named_worlds or params.allow_suicide or free >= 2):
+                # in the unnamed worlds the victim dies, or with suicide the killer becomes a named killer world
+                total += free * child(free - 1, accused, named + (unnamed_worlds and params.allow_suicide,),
+                                      later, unnamed_worlds)
+            if accused:
+                total += accused * child(free, accused - 1, named + (False,), later, unnamed_worlds)
+        else:
+            if free:
+                # in the world where they are the killer, the game ends
+                total += free * child(free - 1, accused + 1, named, later, unnamed_worlds)
+            if accused:
+                total += accused * child(free, accused, named, later, unnamed_worlds)
+        # naming someone already named again, or accusing them, keeps only the named killer worlds before them
+        for j in range(len(named)):
+            if any(named[:j]):
+                total += child(free, accused, named[:j], later + len(named) - j, False)
+        if later and named_worlds:
+            total += later * child(free, accused, named, later, unnamed_worlds)
+        return total
+
+    return counts, normalise
+
+
+def count_tree(params: MurderMysteryParams) -> TreeSize:
+    """Counts the murder game tree for params by dynamic programming, without enumerating it"""
+    n = params.n_people
+    history_counts = _history_counts(params)(1, n - 1, 0, True) * n
+    counts, normalise = _public_counts(params)
+    n_detective_info_sets = counts(1, *normalise(n, 0, (), 0, True))
+    return TreeSize(
+        n_nodes=1 + history_counts.nodes,
+        n_terminals=history_counts.terminals,
+        n_killer_nodes=history_counts.killer_nodes,
+        n_detective_nodes=history_counts.detective_nodes,
+        # the killer's information set includes who they are and every move, so it is a single history
+        n_killer_info_sets=history_counts.killer_nodes,
+        n_detective_info_sets=n_detective_info_sets,
+    )
+
+
+# approximate bytes per row or node for each storage layout, measured with CPython 3.11 and numpy 1.26
+_NUMPY_ROW_OVERHEAD = 112
+_DICT_ENTRY = 70
+_INT_KEY = 32
+_STRING_KEY = 80
+_ARENA_BYTES_PER_NODE = 49
+
+
+def estimate_memory(params: MurderMysteryParams, size: TreeSize = None, int_keys: bool = True) -> Dict[str, int]:
+    """
+    Rough bytes needed by each policy backend (the segmented estimate is an upper bound, as it assumes
+    every action is legal) and by a compiled GameTreeArena
+    """
+    size = size if size is not None else count_tree(params)
+    width = params.n_people + int(params.allow_pass)
+    rows = size.n_info_sets
+    # integer keys still keep the information set string as a label, for display
+    key = _INT_KEY + _DICT_ENTRY + _STRING_KEY if int_keys else _STRING_KEY
+    return {
+        "dict": rows * (3 * (_NUMPY_ROW_OVERHEAD + 8 * width + _DICT_ENTRY) + key),
+        "packed": rows * (3 * 8 * width + _DICT_ENTRY + key),
+        "segmented": rows * (3 * 8 * width + 4 * width + 8 + _DICT_ENTRY + key),
+        "my_policy": rows * (3 * 8 * width + _DICT_ENTRY + _STRING_KEY),
+        "arena": size.n_nodes * _ARENA_BYTES_PER_NODE + rows * (_DICT_ENTRY + _STRING_KEY),
+    }
+
+
+if __name__ == '__main__':
+    for params in [MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=5, max_turns=8),
+                   MurderMysteryParams(allow_pass=True, allow_suicide=True, n_people=7, max_turns=12)]:
+        size = count_tree(params)
+        print(params)
+        print(size)
+        print({backend: f"{n_bytes / 2 ** 20:.1f} MiB" for backend, n_bytes in estimate_memory(params, size).items()})
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from easy_cfr.game_and_agent_interfaces import GameModel
+
+# pre(state, data) -> (context, edges) is called on entering each node. The edges are the (action, child data)
+# pairs to follow, in order: return () at a leaf, or to skip a subtree. They can be a lazy iterable, which is
+# advanced with the walk back at this node. context is handed on to post.
+PreVisit = Callable[[GameModel, Any], Tuple[Any, Iterable[Tuple[int, Any]]]]
+# post(state, context, child_values) -> value is called on leaving each node, with the values its children
+# returned, in edge order
+PostVisit = Callable[[GameModel, Any, Sequence[Any]], Any]
+
+_NO_VALUES = ()
+
+
+def walk_tree(state: GameModel, pre: PreVisit, post: Optional[PostVisit] = None, data: Any = None,
+              in_place: bool = True) -> Any:
+    """
+    Walks the tree below state depth first with an explicit stack, so the depth isn't limited by the recursion
+    limit, and returns what post returns for the root (None if there is no post).
+    With in_place the state is walked with apply() / undo() and left unchanged; otherwise each child is made
+    with state.child(action), which also works for states without undo, e.g. pyspiel's.
+    """
+    node = state
+    context, edges = pre(state, data)
+    edges = iter(edges)
+    values = []
+    # the frames of the ancestors of node; the current frame is kept in locals
+    stack = []
+    while True:
+        for action, child_data in edges:
+            if in_place:
+                node.apply(action)
+                child = node
+            else:
+                child = node.child(action)
+            child_context, child_edges = pre(child, child_data)
+            if child_edges:
+                stack.append((node, context, edges, values))
+                node, context, edges, values = child, child_context, iter(child_edges), []
+                break
+            # leaves are most of the tree, so they are finished here without a frame of their own
+            values.append(post(child, child_context, _NO_VALUES) if post is not None else None)
+            if in_place:
+                node.undo()
+        else:
+            # all the children are done
+            value = post(node, context, values) if post is not None else None
+            if not stack:
+                return value
+            node, context, edges, values = stack.pop()
+            if in_place:
+                node.undo()
+            values.append(value)
+
+
+def iter_tree(state: GameModel, post_order: bool = False, in_place: bool = True) -> Iterator[Tuple[GameModel, int]]:
+    """
+    Yields each node below state with its depth, in pre-order or post-order, from an explicit stack.
+    With in_place, the node yielded is state itself part way through the walk, so it is only valid until the
+    next one is asked for and must not be changed: copy_state() it to keep it. state is put back if the
+    generator is closed early.
+    """
+    node = state
+    actions = iter(() if state.is_terminal() else state.actions())
+    # the frames of the ancestors of node
+    stack = []
+    try:
+        if not post_order:
+            yield state, 0
+        while True:
+            for action in actions:
+                if in_place:
+                    node.apply(action)
+                    child = node
+                else:
+                    child = node.child(action)
+                stack.append((node, actions))
+                node, actions = child, iter(() if child.is_terminal() else child.actions())
+                if not post_order:
+                    yield node, len(stack)
+                break
+            else:
+                if post_order:
+                    yield node, len(stack)
+                if not stack:
+                    return
+                node, actions = stack.pop()
+                if in_place:
+                    node.undo()
+    finally:
+        # each frame on the stack is one apply() still to undo
+        if in_place:
+            for _ in range(len(stack)):
+                state.undo()
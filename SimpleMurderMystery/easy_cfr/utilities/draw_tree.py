@@ -1,34 +1,34 @@
 from typing import List, Optional
 
 from easy_cfr.game_and_agent_interfaces import GameModel
+from easy_cfr.tree_walk import iter_tree, walk_tree
 from easy_cfr.utilities.graph_view_pygame import GraphNode, GraphView, Params
 
 
 def enumerate_states(state: GameModel, states: Optional[List[GameModel]] = None) -> List[GameModel]:
     states = states or []
-    states.append(state)
-    if not state.is_terminal():
-        for action in state.actions():
-            next_state = state.copy_state()
-            next_state.act(action)
-            enumerate_states(next_state, states)
+    # each child is a copy, so the states can all be kept
+    states.extend(node for node, _ in iter_tree(state, in_place=False))
     return states
 
 
 def build_graph(state: GameModel, parent: Optional[GraphNode] = None) -> GraphNode:
-    parent.label = state.information_set()  # str(state)
-    if state.is_terminal():
-        parent.label = str(state.returns()[0])
-    # parent.label = str(state)
-    # print(f"{parent.label=}, {state.information_set()=}")
-    if not state.is_terminal():
-        for action in state.actions():
-            action_string = state.action_to_string(action)
-            next_state = state.copy_state()
-            next_state.act(action)
-            child = parent.add(action_string)
-            child.label = str(state)
-            build_graph(next_state, child)
+    def add_child(state: GameModel, node: GraphNode, action: int) -> GraphNode:
+        # called as the walk reaches each edge, so the nodes are numbered in the same order as before
+        child = node.add(state.action_to_string(action))
+        child.label = str(state)
+        return child
+
+    def visit(state: GameModel, node: GraphNode):
+        node.label = state.information_set()  # str(state)
+        if state.is_terminal():
+            node.label = str(state.returns()[0])
+            return None, ()
+        # node.label = str(state)
+        # print(f"{node.label=}, {state.information_set()=}")
+        return None, ((action, add_child(state, node, action)) for action in state.actions())
+
+    walk_tree(state, visit, data=parent)
     return parent
 
 
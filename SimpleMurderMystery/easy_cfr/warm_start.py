@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Dict, Optional
+
+import numpy as np
+
+from easy_cfr.checkpoint import policy_tables
+from easy_cfr.game_and_agent_interfaces import GameModel, Player
+from easy_cfr.murder_mystery import MurderMysteryParams, MurderGameModel
+from easy_cfr.simpler_cfr import InfoSetTabularPolicy, FullCFR, run_easy_cfr, CFRVariant, DCFRParams
+from easy_cfr.tree_walk import iter_tree
+
+
+def source_rows(source) -> Dict[str, int]:
+    """Row index by information set string, for a MyPolicy or an InfoSetTabularPolicy"""
+    keys, _, _, _ = policy_tables(source)
+    if getattr(source, "int_keys", False):
+        return {source.labels[key]: i for i, key in enumerate(keys)}
+    return {key: i for i, key in enumerate(keys)}
+
+
+def seed_policy(state: GameModel, source, int_keys: bool = False,
+                policy: Optional[InfoSetTabularPolicy] = None) -> InfoSetTabularPolicy:
+    """
+    A policy for the game below state whose current and average policies are the source's average policy,
+    with zero regrets. The rows are created in the order the first CFR pass would, and matched to the source by
+    information set string, so the two can use different key types. Unmatched rows start uniform, as usual.
+    """
+    policy = policy if policy is not None else InfoSetTabularPolicy(int_keys)
+    rows = source_rows(source)
+    _, _, _, average = policy_tables(source)
+    width = state.max_actions()
+    if rows and average.shape[1] != width:
+        raise ValueError(f"source rows have width {average.shape[1]} but the game has {width} actions")
+    for node, _ in iter_tree(state):
+        if node.is_terminal() or node.current_player() == Player.CHANCE:
+            continue
+        key = policy.key(node)
+        if key in policy.policy_dict:
+            continue
+        policy.p_actions(key, width)
+        row = rows.get(policy.key_label(key))
+        if row is not None:
+            policy.p_action_dict[key][:] = average[row]
+            policy.policy_dict[key][:] = average[row]
+    return policy
+
+
+def warm_start_policy(state: GameModel, source, weight: int = 10, int_keys: bool = False,
+                      policy: Optional[InfoSetTabularPolicy] = None) -> InfoSetTabularPolicy:
+    """
+    Seeds a solve of the game below state from a policy solved for a nearby setting, e.g. other costs or
+    max_turns, as if the source's average policy had been played for weight iterations of the new game:
+    the regrets are weight times its counterfactual regrets in the new game, from one CFR pass, and the average
+    policy is the source's. Continue the solve from start_step=weight, so that the average keeps that weight.
+    Regrets copied from the source would be in the old game's terms, and after a long solve they swamp the new
+    ones, so the policy barely moves.
+    """
+    policy = seed_policy(state, source, int_keys, policy)
+    full_cfr = FullCFR(state, policy)
+    full_cfr.calc_cfr(state, np.ones(full_cfr.n_players + 1))
+    policy.scale_regrets(weight)
+    policy.regret_match()
+    return policy
+
+
+def run_warm_started_cfr(state_factory, source, n_iterations: int = 100, weight: int = 10,
+                         int_keys: bool = False,
+                         policy: Optional[InfoSetTabularPolicy] = None,
+                         variant: CFRVariant = CFRVariant.VANILLA,
+                         dcfr_params: DCFRParams = DCFRParams(),
+                         verbose: bool = False) -> InfoSetTabularPolicy:
+    """Runs n_iterations of run_easy_cfr from a policy seeded by warm_start_policy"""
+    policy = warm_start_policy(state_factory(), source, weight, int_keys, policy)
+    return run_easy_cfr(state_factory, weight + n_iterations, policy=policy, variant=variant,
+                        dcfr_params=dcfr_params, start_step=weight, verbose=verbose)
+
+
+if __name__ == '__main__':
+    from easy_cfr.exploitability import exploitability
+
+    solved_params = MurderMysteryParams(allow_pass=True, allow_suicide=False, n_people=4, max_turns=6)
+    solved = run_easy_cfr(partial(MurderGameModel, solved_params), 300, verbose=False)
+    for params in [solved_params._replace(cost_per_accusation=15), solved_params._replace(success_score=80),
+                   solved_params._replace(max_turns=5)]:
+        state_factory = partial(MurderGameModel, params)
+        cold = run_easy_cfr(state_factory, 40, verbose=False)
+        warm = run_warm_started_cfr(state_factory, solved, 40)
+        print(f"{params}\n  cold={exploitability(state_factory(), cold):.4f}, "
+              f"warm={exploitability(state_factory(), warm):.4f}")
@@ -6,6 +6,7 @@ from open_spiel.python.algorithms import exploitability, cfr
 
 import numpy as np
 
+from easy_cfr.tree_walk import walk_tree
 from murderspiel.pyspiel_murder_variations import MurderMysteryVariationsGame, MurderMysteryParams
 import itertools as it
 
@@ -43,18 +44,26 @@ def advantage_as_first_player(state: State, player: TabularPolicy, opponent: Tab
     """
     Computes the advantage (expected reward) for player compared to opponent when player only plays as player one
     """
-    if state.is_terminal():
-        return state.returns()[player_role]
-    elif state.current_player() == PlayerId.CHANCE:
-        ap = state.chance_outcomes()
-    elif state.current_player() == player_role:
-        ap = policy_as_list(player, state)
-    elif state.current_player() == 1 - player_role:
-        ap = policy_as_list(opponent, state)
-    else:
-        raise Exception("Should not be here")
-
-    return sum(p * advantage_as_first_player(state.child(a), player, opponent, player_role) for a, p in ap)
+    def enter(state: State, _):
+        if state.is_terminal():
+            return None, ()
+        elif state.current_player() == PlayerId.CHANCE:
+            ap = state.chance_outcomes()
+        elif state.current_player() == player_role:
+            ap = policy_as_list(player, state)
+        elif state.current_player() == 1 - player_role:
+            ap = policy_as_list(opponent, state)
+        else:
+            raise Exception("Should not be here")
+        return [p for _, p in ap], [(a, None) for a, _ in ap]
+
+    def leave(state: State, probs: List[float], values: List[float]) -> float:
+        if probs is None:
+            return state.returns()[player_role]
+        return sum(p * value for p, value in zip(probs, values))
+
+    # pyspiel states can't undo an action, so each child is made with state.child()
+    return walk_tree(state, enter, leave, in_place=False)
 
 
 def total_advantage(game: Game, player: TabularPolicy, opponent: TabularPolicy) -> float: